@@ -0,0 +1 @@
+# Keeps the repository root importable when the tests run through a bare `pytest`
@@ -1,99 +1,146 @@
 import sys
 import os
-import platform
+import time
 
-import cv2
-import torch
-from ultralytics import YOLO
-import pygame
+IMPORT_START = time.perf_counter()
 
-from modules import *
+from PySide6.QtCore import *
+from PySide6.QtGui import *
+from PySide6.QtWidgets import *
+
+from modules import (
+    AlertPlayer, DetectionPipeline, MeasuredTimer, MetricsStore, ModelLoader, Presence, ScoringEngine, SessionStore,
+    Settings, UIFunctions, Ui_MainWindow, class_ids, lazy_import, select_boxes, startup_profile,
+) # Named imports only, each one loads just its own submodule
 from widgets import *
 
-from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg as FigureCanvas
-from matplotlib.figure import Figure
-import matplotlib.pyplot as plt
-import seaborn as sns
+# HEAVY LIBRARIES LOAD ON FIRST USE, see modules/lazy.py
+cv2 = lazy_import("cv2")
+
+# The profile is created while importing modules, rebase it so Qt/UI/resources imports are included
+startup_profile.origin = IMPORT_START
+startup_profile.record("import modules, widgets (Qt, UI, resources)", IMPORT_START, time.perf_counter())
 
 os.environ["QT_FONT_DPI"] = "96" # FIX Problem for High DPI and Scale above 100%
 
 # SET AS GLOBAL WIDGETS
 widgets = None
 
+# Most frequent distraction -> message shown in errorLabel
+CRITICAL_ERROR_TEXT = {
+    "away": "You are often away from your screen.",
+    "phone": "You are often looking at or playing with your cellphone.",
+    "drowsy": "You are often drowsy or sleepy. You need some rest.",
+}
+
+class DetectionSignals(QObject):
+    # Emitted from the inference worker thread, delivered queued on the GUI thread
+    ready = Signal(object)
+
+class FrameSignals(QObject):
+    # Emitted from the capture thread when a new frame lands in the buffer
+    ready = Signal()
+
+class ModelLoaderSignals(QObject):
+    # Emitted from the model loader thread
+    progress = Signal(int, int, str)
+    ready = Signal(object)
+    failed = Signal(str)
+
 class MainWindow(QMainWindow):
     def __init__(self):
         QMainWindow.__init__(self)
 
-        self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-
         # SET AS GLOBAL WIDGETS
-        self.ui = Ui_MainWindow()
-        self.ui.setupUi(self)
+        with startup_profile.phase("Building UI"):
+            self.ui = Ui_MainWindow()
+            self.ui.setupUi(self)
         global widgets
         widgets = self.ui
 
         # Flag for when we start timer
         self.started = False
         
-        self.frame_skip = 2
-        self.frame_count = 0
+        self.frame_skip = Settings.FRAME_SKIP # Detection runs on every Nth captured frame
 
         self.graph_frame_count = 0
         self.graph_frame_skip = 5  # Update the graph every 5 frames
 
         # Webcam
-        self.cap = None # Webcam off as default
-        self.person_not_in_frame = 0 # Initialize counter for when person leaves
-        self.phone_in_frame = 0 # Initialize counter for cell phone detection
-        self.drowsiness = 0 # Initialize drowsiness meter
+        self.pipeline = None # Webcam off as default, capture -> detect -> score runs off the GUI thread
+        self.last_frame_index = -1 # Index of the last frame taken from the capture buffer
+        self.session_state = ScoringEngine() # Time-based productivity, distraction totals and alerts
         
         # Time
         self.minute = 0
         self.seconds = 0
 
         self.timer_start_time = None  # Time when the timer was started
-        self.timer_update_interval = 1  # Update every second
-        self.timer_id = None  # ID of the timer
+
+        # TIMERS - one per job so none of them competes with the others
+        # Stopwatch ticks once per displayed second, re-aligned to the second boundary on every tick
+        self.stopwatch_timer = MeasuredTimer("stopwatch", 1000, self.update_stopwatch, Qt.CoarseTimer, parent=self)
+        # Frame pump is a single shot armed by the capture thread's frame signal, capped at DISPLAY_MAX_FPS
+        self.frame_timer = MeasuredTimer("frames", 0, self.pump_frame, Qt.PreciseTimer, single_shot=True, parent=self)
+        self.frame_interval = 1.0 / Settings.DISPLAY_MAX_FPS
+        self.last_pump = 0.0
+        self.frame_signals = FrameSignals()
+        self.frame_signals.ready.connect(self.schedule_frame)
+        # Productivity sampling and the graph run at the graph's capped rate while the stopwatch runs
+        self.graph_timer = MeasuredTimer("graph", int(1000 / Settings.GRAPH_MAX_FPS), self.refresh_productivity, parent=self)
 
         widgets.timerLabel.display("00:00")
 
         # Data Collection
         self.stopwatch_list = [] # Stores our list of stopwatch times
-        self.person_not_in_frame_list = [] # Stores our list of person leaving frame frames
-        self.phone_in_frame_list = [] # Stores our list of phone being in camera
-        self.drowsiness_list = [] # Stores list of drowsiness frames
+        # Bounded ring buffers with per-second/per-minute rollups:
+        #   "away_seconds", "phone_seconds", "drowsy_seconds" - length of each distraction episode in seconds
+        #   "productivity" - productivity level against seconds since the timer started
+        self.metrics = MetricsStore(Settings.METRICS_CAPACITY)
+        self.graph_points = 0 # Closed per-second productivity buckets already on the graph
+
+        # Session history, written to SQLite in batches by a background thread
+        self.session_store = SessionStore(Settings.SESSION_DB, Settings.SESSION_BATCH_SIZE)
+        self.session_store.start()
+        self.session_id = None # Set while the timer is running
 
         self.graph_status = True
-        self.time_axis = None # Representation of time in the productivity graph
-        self.productivity_axis = None # Productivity over time in the productivity graph
-        self.productivity_val = 100
-        self.final_person_count = 0
-        self.final_cellphone_count = 0
-        self.final_drowsy_count = 0
-        sns.set_theme()
-        sns.set_context("paper")
+        self.graph = None # Persistent productivity chart, created on first use
 
         widgets.startTimerButton.clicked.connect(self.start_timer) # Start Button
         widgets.stopTimerButton.clicked.connect(self.stop_timer) # Stop Button
         
 
-        self.model = torch.hub.load('ultralytics/yolov5', 'yolov5s').to(self.device)
-        self.model.classes = [0, 67]
-        self.model_2 = torch.hub.load('ultralytics/yolov5', 'custom', path='drowsiness.pt', force_reload=True).to(self.device)
-        self.model.to('cuda')
-        self.model_2.to('cuda')
+        # Alert sound is decoded once on its own audio thread
+        self.alerts = AlertPlayer(Settings.ALERT_SOUND, Settings.ALERT_COOLDOWN)
+        self.alerts.start()
+
+        # Models load in the background after the window is shown
+        self.device = None
+        self.model = None
+        self.model_2 = None
+        self.engine = None
 
+        # VIDEO SURFACE - takes the place of the webcam label, frames are scaled at paint time
+        if Settings.VIDEO_SURFACE == "opengl" and GLVideoWidget is not None:
+            self.video = GLVideoWidget(widgets.new_page)
+            self.video.failed.connect(self.use_raster_video, Qt.QueuedConnection) # Never swap from inside GL callbacks
+        else:
+            self.video = VideoWidget(widgets.new_page)
+        self.video.setGeometry(widgets.videoLabel.geometry())
+        widgets.videoLabel.hide()
 
-        print(torch.cuda.is_available())
-        print(torch.cuda.current_device())
-        print(torch.cuda.get_device_name(0))
+        # Detection results arrive from the inference worker thread
+        self.latest_result = None
+        self.detection_signals = DetectionSignals()
+        self.detection_signals.ready.connect(self.on_detections)
 
         # App Settings
         Settings.ENABLE_CUSTOM_TITLE_BAR = True
         title = "FocusGuardian"
-        description = "FocusGuardian - AI driven solutions to help you ace more exams."
+        self.description = "FocusGuardian - AI driven solutions to help you ace more exams."
         self.setWindowTitle(title)
-        widgets.titleRightInfo.setText(description)
+        widgets.titleRightInfo.setText(self.description)
 
         widgets.toggleButton.clicked.connect(lambda: UIFunctions.toggleMenu(self, True)) # TOGGLE MENU
 
@@ -110,6 +157,7 @@ class MainWindow(QMainWindow):
 
 
         self.show() # SHOW APP
+        startup_profile.mark("Window shown")
 
         # SET HOME PAGE AND SELECT MENU
         widgets.stackedWidget.setCurrentWidget(widgets.home)
@@ -134,222 +182,221 @@ class MainWindow(QMainWindow):
         widgets.personLabel.setStyleSheet(checkbox_stylesheet)
         widgets.phoneLabel.setStyleSheet(checkbox_stylesheet)
         widgets.drowsinessLabel.setStyleSheet(checkbox_stylesheet)
+        widgets.personLabel.toggled.connect(self.on_detection_toggled)
+        widgets.phoneLabel.toggled.connect(self.on_detection_toggled)
+        widgets.drowsinessLabel.toggled.connect(self.on_detection_toggled)
+
+        # LOAD MODELS IN THE BACKGROUND, CAMERA PAGE UNLOCKS WHEN THEY ARE READY
+        widgets.btn_new.setEnabled(False)
+        self.loader_signals = ModelLoaderSignals()
+        self.loader_signals.progress.connect(self.on_models_progress)
+        self.loader_signals.ready.connect(self.on_models_ready)
+        self.loader_signals.failed.connect(self.on_models_failed)
+        self.loader = ModelLoader(self.loader_signals.progress.emit, self.loader_signals.ready.emit, self.loader_signals.failed.emit, "--refresh-models" in sys.argv)
+        self.loader.start()
+
+    def on_models_progress(self, step, total, message):
+        widgets.titleRightInfo.setText(f"Loading models {int(100 * step / total)}% - {message}")
+
+    def on_models_ready(self, loaded):
+        self.device, self.model, self.model_2, self.engine = loaded
+        self.person_id, self.phone_id = class_ids(self.model.names, ("person", "cell phone"))
+        widgets.titleRightInfo.setText(self.description)
+        widgets.btn_new.setEnabled(True)
+        startup_profile.mark("Models ready")
+        if "--profile-startup" in sys.argv:
+            print(startup_profile.report(importtime=True))
+            QApplication.quit()
+        else:
+            print(startup_profile.report())
+
+    def on_models_failed(self, error):
+        widgets.titleRightInfo.setText(f"Could not load models - {error}")
+        print(f"Model loading failed: {error}")
 
-    def play_alert_sound(self):
-        pygame.mixer.init()
-        pygame.mixer.music.load('radar.mp3')
-        pygame.mixer.music.play()
-        while pygame.mixer.music.get_busy():
-            pygame.time.Clock().tick(10)
-        pygame.mixer.quit()
-    
     def updated_graph(self, productivity_val):
-        fig = Figure(figsize = (5.31, 2.11))
-        ax = fig.add_subplot()
-        ax.set_xlabel('Time')
-        ax.set_ylabel('Productivity Level')
-        ax.tick_params(colors='white', which='both')
-        ax.xaxis.label.set_color('white')
-        ax.yaxis.label.set_color('white')
-        fig.set_facecolor('none')
-        if self.time_axis != None:
-            self.time_axis.append(self.time_axis[-1] + 1)
-        else:
-            self.time_axis = [1]
-        if self.productivity_axis != None:
-            self.productivity_axis.append(productivity_val)
-        else:
-            self.productivity_axis = [productivity_val]
-        ax.plot(self.time_axis, self.productivity_axis, color='red')
-        ax.set_facecolor('none')
-        canvas = FigureCanvas(fig)
-        
-        widgets.productivityGraph.takeAt(0)
-        widgets.productivityGraph.addWidget(canvas)
-        
+        if self.graph is None:
+            # Created once, matplotlib and seaborn load here on first use
+            with startup_profile.phase("Creating productivity graph"):
+                self.graph = ProductivityGraph(max_points=Settings.GRAPH_MAX_POINTS, max_fps=Settings.GRAPH_MAX_FPS)
+            widgets.productivityGraph.addWidget(self.graph)
+
+        self.metrics.record("productivity", self.elapsed_seconds(), productivity_val)
+        self.push_graph_points()
+
+    def push_graph_points(self):
+        # The graph plots per-second means, only newly closed buckets are appended
+        closed = self.metrics.closed_buckets("productivity", "second")
+        if closed > self.graph_points:
+            times, values = self.metrics.window("productivity", closed - self.graph_points, "second")
+            for t, value in zip(times, values):
+                self.graph.append(t, value)
+            self.graph_points = closed
+
     def remove_graph(self):
-        widgets.productivityGraph.takeAt(0)
-        self.time_axis = None
-        self.productivity_axis = None
-	
+        if self.graph is not None:
+            self.graph.clear()
+        self.metrics.clear("productivity")
+        self.graph_points = 0
+
+    def elapsed_seconds(self):
+        return (cv2.getTickCount() - self.timer_start_time) / cv2.getTickFrequency()
 
     def start_timer(self):
-        if self.timer_id:
-            # If timer is already running, stop it first
-            self.killTimer(self.timer_id)
+        if self.started:
+            # If timer is already running, stop it first so its session is closed and saved
+            self.stop_timer()
 
-        if (self.time_axis != None) or (self.productivity_axis != None):
+        if self.metrics.metric("productivity").count:
             self.remove_graph()
         
         self.timer_start_time = cv2.getTickCount()  # Get current tick count
-        self.timer_id = self.startTimer(self.timer_update_interval)  # Start the timer
+        self.stopwatch_timer.start(1000)
+        self.graph_timer.start()
         self.started = True
+        self.session_state.reset() # Totals, episodes and productivity belong to one session
+        self.session_state.started = True
+        self.session_id = self.session_store.start_session()
 
     def stop_timer(self):
-        if self.timer_id:
-            self.killTimer(self.timer_id)
-            self.timer_id = None
+        if self.started:
+            self.stopwatch_timer.stop()
+            self.graph_timer.stop()
+            self.update_stopwatch() # Final time, the last coarse tick may be almost a second old
             widgets.timerLabel.display("00:00")
-            self.updated_graph(self.productivity_val)
+            self.updated_graph(self.session_state.advance(time.monotonic()))
+            self.metrics.flush("productivity") # Close the last partial second so it reaches the graph
+            self.push_graph_points()
+            self.graph.refresh(force=True) # Show the final point even if the last tick was rate limited
+            state = self.session_state
+            self.session_store.end_session(self.session_id, self.elapsed_seconds(), state.productivity, state.totals["away"], state.totals["phone"], state.totals["drowsy"], state.critical_error())
+            self.session_id = None
             widgets.errorLabel.setText("Your Most Critical Error")
             self.stopwatch_list.append((self.minutes, self.seconds))
             self.minutes, self.seconds = 0, 0
             self.started = False
+            self.session_state.started = False
         
+    def use_raster_video(self, error):
+        # OpenGL surface couldn't render, replace it with the QPainter one in the same spot
+        if not isinstance(self.video, GLVideoWidget):
+            return
+        gl_video = self.video
+        self.video = VideoWidget(gl_video.parentWidget())
+        self.video.overlay = gl_video.overlay
+        self.video.setGeometry(gl_video.geometry())
+        self.video.setVisible(gl_video.isVisible())
+        gl_video.hide()
+        gl_video.deleteLater()
+        print(f"Video surface: raster ({error})")
+
     def start_video_feed(self):
-        if self.cap is None:
-            self.cap = cv2.VideoCapture(0)
-            self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
-            self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
+        if self.pipeline is None:
+            self.pipeline = DetectionPipeline(self.engine, self.session_state, Settings.CAMERA_INDEX, self.detection_signals.ready.emit, self.frame_skip)
+            self.on_detection_toggled()
+            self.last_frame_index = -1
 
-            
-        # Timer to update the video feed
-        self.timer = self.startTimer(42)  # Update every 30ms
+            # Frames are pumped to the screen as the capture thread produces them
+            self.pipeline.capture.buffer.on_push = self.frame_signals.ready.emit
+            self.pipeline.start()
 
     def stop_video_feed(self):
-        if self.cap:
-            self.killTimer(self.timer)
-            self.cap.release()
-            self.cap = None
-
-    def timerEvent(self, event):
-        if event.timerId() == self.timer_id:
-            # Timer event for our timer
-            elapsed_ticks = cv2.getTickCount() - self.timer_start_time
-            elapsed_time = elapsed_ticks / cv2.getTickFrequency() # Convert to seconds
-            self.minutes, self.seconds = divmod(elapsed_time, 60)
-            widgets.timerLabel.display(f"{int(self.minutes):02d}:{int(self.seconds):02d}")
-        else:
-
-            self.frame_count += 1
-            if self.frame_count % self.frame_skip != 0:
-                return
-            
-            ret, frame = self.cap.read()
-            if ret:
-                frame_tensor = torch.from_numpy(frame).permute(2, 0, 1).float().div(255).to(self.device)  # Assuming your model expects float input in [0, 1]
-
-                # Step 1: Process frame with YOLOv5
-                results = self.model(frame)  # Process the frame
-                pred = results.pred[0] # Get the first prediction (in case of batch processing)
-
-                results2 = self.model_2(frame) # Process drowsiness
-                pred2 = results2.pred[0]
-
-                person_detected = False
-                phone_detected = False
-                drowsiness_detected = False
-
-                # Get the status of the checkboxes
-                person_detection_enabled = widgets.personLabel.isChecked()
-                phone_detection_enabled = widgets.phoneLabel.isChecked()
-                drowsiness_enabled = widgets.drowsinessLabel.isChecked()
-
-                # Step 2: Draw bounding boxes and labels on the frame
-                for det in pred:
-                    if det[4] > 0.1:  # Confidence threshold, can be adjusted
-                        x1, y1, x2, y2 = map(int, det[:4])
-                        label_name = self.model.names[int(det[5])]
-                                        
-                        label = f'{label_name} {det[4]:.2f}'  
-
-                        if label_name == "person":
-                            person_detected = True
-                            # Only draw if the checkbox is checked
-                            if person_detection_enabled:
-                                frame = cv2.rectangle(frame, (x1, y1), (x2, y2), (0, 255, 0), 2)  # Draw a green rectangle
-                                frame = cv2.putText(frame, label, (x1, y1), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 2)
-                        elif label_name == "cell phone":
-                            phone_detected = True
-                            # Only draw if the checkbox is checked
-                            if phone_detection_enabled:
-                                frame = cv2.rectangle(frame, (x1, y1), (x2, y2), (255, 0, 0), 2)  # Draw a green rectangle
-                                frame = cv2.putText(frame, label, (x1, y1), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 2)
-
-                for det in pred2:
-                    if det[4] > 0.1:
-                        x1, y1, x2, y2 = map(int, det[:4])
-                        label_name = self.model_2.names[int(det[5])]
-                                    
-                        label = f'{label_name} {det[4]:.2f}'  
-
-                        if label_name == 'drowsy':
-                            drowsiness_detected = True
-                        if drowsiness_enabled:
-                                frame = cv2.rectangle(frame, (x1, y1), (x2, y2), (0, 0, 255), 2)  # Draw a green rectangle
-                                frame = cv2.putText(frame, label, (x1, y1), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 2)
-
-
-                # Check if a person was detected and reset or increment counter
-                if person_detected and person_detection_enabled:
-                    if self.person_not_in_frame != 0:
-                        self.person_not_in_frame_list.append(self.person_not_in_frame)
-                    self.person_not_in_frame = 0
-                else:
-                    self.person_not_in_frame += 1
-                    if person_detection_enabled:
-                        self.productivity_val -= 5
-                        self.final_person_count += 1
-
-
-                # Check if a cell phone was detected and increment counter
-                if phone_detected and phone_detection_enabled:
-                    self.phone_in_frame += 1
-                    if phone_detection_enabled:
-                        self.productivity_val -= 5
-                        self.final_cellphone_count += 1
-                else:
-                    if self.phone_in_frame != 0:
-                        self.phone_in_frame_list.append(self.phone_in_frame)
-                    self.phone_in_frame = 0
-
-                # Check if drowsiness detected and incremeent counter
-                if drowsiness_detected and drowsiness_enabled:
-                    self.drowsiness += 1
-                    if drowsiness_enabled:
-                        self.productivity_val -= 5
-                        self.final_drowsy_count += 1
-                else:
-                    if self.drowsiness != 0:
-                        self.drowsiness_list.append(self.drowsiness)
-                    self.drowsiness = 0
-
-                # Check if cell phone has been in frame for more than 5 frames
-                if (self.phone_in_frame > 5) and self.started:
-                    self.play_alert_sound()
-                    self.phone_in_frame = 0  # Resetting the count after playing the sound.
-
-                # Check if a person has been away for more than 5 frames
-                if (self.person_not_in_frame > 5) and self.started:
-                    self.play_alert_sound()
-                    self.person_not_in_frame = 0  # Resetting the count after playing the sound.
-
-                # Check if a person has been drowsy for more than 5 frames
-                if (self.drowsiness > 15) and self.started:
-                    self.play_alert_sound()
-                    self.drowsiness = 0
-
-                # Step 3: Display the frame
-                rgb_image = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                h, w, ch = rgb_image.shape
-                bytes_per_line = ch * w
-                convert_to_Qt_format = QImage(rgb_image.data, w, h, bytes_per_line, QImage.Format.Format_RGB888)
-                p = convert_to_Qt_format.scaled(533, 400, Qt.AspectRatioMode.KeepAspectRatio)
-                widgets.videoLabel.setPixmap(QPixmap.fromImage(p))
-        # Update Graph Here:
-        if self.started:
-            self.updated_graph(self.productivity_val)
-            if self.productivity_val <= 100:
-                self.productivity_val += 1
-
-        if self.final_person_count > self.final_cellphone_count and self.final_person_count > self.final_drowsy_count:
-            widgets.errorLabel.setText("You are often away from your screen.")
-
-        elif self.final_cellphone_count > self.final_person_count and self.final_cellphone_count > self.final_drowsy_count:
-            widgets.errorLabel.setText("You are often looking at or playing with your cellphone.")
-
-        elif self.final_drowsy_count > self.final_cellphone_count and self.final_drowsy_count > self.final_person_count:
-            widgets.errorLabel.setText("You are often drowsy or sleepy. You need some rest.")
+        if self.pipeline:
+            self.pipeline.capture.buffer.on_push = None
+            self.frame_timer.stop()
+            self.pipeline.stop()
+            self.pipeline = None
+            self.latest_result = None
+            self.video.overlay.clear()
+            self.video.update()
+
+    def on_detections(self, scored):
+        # Delivered on the GUI thread through DetectionSignals, already scored by the pipeline
+        result, presence, update = scored
+        self.latest_result = result
+
+        # Queue the frame for the session database, the writer thread does the I/O
+        if self.session_id:
+            wall_time = time.time() - (time.monotonic() - result.timestamp)
+            self.session_store.log_detection(self.session_id, result.frame_index, wall_time, presence.person, presence.phone, presence.drowsy, update.productivity)
+
+        for event in update.events:
+            if event.kind == "ended":
+                self.metrics.record(f"{event.reason}_seconds", result.timestamp, event.value)
+            elif event.kind == "alert":
+                self.alerts.play(event.reason)
+
+    def on_detection_toggled(self):
+        # Checkbox state is read by the pipeline on the inference thread
+        enabled = Presence(widgets.personLabel.isChecked(), widgets.phoneLabel.isChecked(), widgets.drowsinessLabel.isChecked())
+        if self.pipeline:
+            self.pipeline.enabled = enabled
+
+        # The overlay hides boxes while painting, no frame is redrawn and nothing is re-detected
+        self.video.overlay.set_visible("person", enabled.person)
+        self.video.overlay.set_visible("phone", enabled.phone)
+        self.video.overlay.set_visible("drowsy", enabled.drowsy)
+        self.video.update()
+
+    def detection_records(self, result):
+        # Every confident person/phone/drowsiness box as an overlay record, the checkboxes only filter at paint time
+        pred, pred2 = result.detections
+        records = []
+        for box, conf, cls in zip(*select_boxes(pred, [self.person_id, self.phone_id])):
+            records.append(OverlayItem("person" if cls == self.person_id else "phone", tuple(box), self.model.names[cls], float(conf)))
+        for box, conf, cls in zip(*select_boxes(pred2)):
+            records.append(OverlayItem("drowsy", tuple(box), self.model_2.names[cls], float(conf)))
+        return records
+
+    def update_stopwatch(self):
+        elapsed_time = self.elapsed_seconds()
+        self.minutes, self.seconds = divmod(elapsed_time, 60)
+        widgets.timerLabel.display(f"{int(self.minutes):02d}:{int(self.seconds):02d}")
+        if self.stopwatch_timer.is_active():
+            self.stopwatch_timer.start(1000 - int(elapsed_time * 1000) % 1000) # Next tick right after the next second
+
+    def schedule_frame(self):
+        # A new frame was captured, arm the pump unless it's already pending, no sooner than the display cap allows
+        if self.pipeline and not self.frame_timer.is_active():
+            wait = self.frame_interval - (time.monotonic() - self.last_pump)
+            self.frame_timer.start(wait * 1000 if wait > 0 else 0)
+
+    def pump_frame(self):
+        if self.pipeline is None:
+            return
+        self.last_pump = time.monotonic()
+
+        # Never block on camera I/O, take the freshest frame the capture thread has
+        captured = self.pipeline.capture.buffer.latest(self.last_frame_index)
+        if captured is None:
+            return
+        self.last_frame_index = captured.index
+        # Clean copy of the camera frame in the widget's preallocated buffer, nothing is drawn into it
+        self.video.frame_buffer(captured.image.shape)[...] = captured.image
+
+        # Overlay the most recent detections, inference runs at its own pace
+        # Tracked person/phone boxes follow every frame in between detector runs
+        if self.latest_result is not None:
+            result = self.latest_result
+            tracked = self.pipeline.tracked_boxes(captured)
+            if tracked is not None:
+                result = result._replace(detections=(tracked, result.detections[1]))
+            self.video.overlay.set_items(self.detection_records(result))
+
+        # Current adaptive cadence decisions
+        if Settings.DEBUG_OVERLAY and self.pipeline.cadence:
+            self.video.overlay.status = self.pipeline.cadence.describe()
+
+        # Display the frame, the widget composites the overlay and scales while painting
+        self.video.present()
+
+    def refresh_productivity(self):
+        # Graph point and the critical error label at the graph's capped rate, recovery keeps running between detections
+        self.updated_graph(self.session_state.advance(time.monotonic()))
+
+        critical_error = self.session_state.critical_error()
+        if critical_error:
+            widgets.errorLabel.setText(CRITICAL_ERROR_TEXT[critical_error])
 
 
     # BUTTONS CLICK
@@ -373,6 +420,12 @@ class MainWindow(QMainWindow):
         print(f'Button "{btnName}" pressed!')
 
 
+    # CLOSE EVENT
+    def closeEvent(self, event):
+        self.stop_video_feed()
+        self.session_store.close() # Flush queued session rows
+        event.accept()
+
     # RESIZE EVENTS
     def resizeEvent(self, event):
         UIFunctions.resize_grips(self) # Update Size Grips
@@ -384,14 +437,21 @@ class MainWindow(QMainWindow):
         if event.buttons() == Qt.LeftButton:
             print('Mouse click: LEFT CLICK')
             
-            print(f"User's list where person leaves frame: {self.person_not_in_frame_list}")
+            print(f"User's recent seconds away from the frame: {self.metrics.window('away_seconds', 20)[1].round(1).tolist()}")
             print(f"User's list of stopwatch times, stored in (minutes, seconds): {self.stopwatch_list}")
-            print(f"User's list of frames where cell phone is detected: {self.phone_in_frame_list}")
+            print(f"User's recent seconds on the phone: {self.metrics.window('phone_seconds', 20)[1].round(1).tolist()}")
+            print(f"Productivity summary: {self.metrics.summary('productivity')}")
+            if self.pipeline:
+                print(f"Pipeline stats: {self.pipeline.stats()}")
+            print(f"Alert stats: {self.alerts.stats()}")
+            print(f"Session store: {self.session_store.stats()}")
+            print(f"Timers: {dict((t.name, t.stats()) for t in (self.stopwatch_timer, self.frame_timer, self.graph_timer))}")
 
         if event.buttons() == Qt.RightButton:
             print('Mouse click: RIGHT CLICK')
 
 if __name__ == "__main__":
+    # python main.py --profile-startup prints an importtime-style breakdown of startup and exits once models are ready
     app = QApplication(sys.argv)
     app.setWindowIcon(QIcon("icon.ico"))
     window = MainWindow()
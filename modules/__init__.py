@@ -1,15 +1,98 @@
-from PySide6.QtCore import *
-from PySide6.QtGui import *
-from PySide6.QtWidgets import *
+import importlib
 
-# GUI FILE
-from . ui_main import Ui_MainWindow
+# PACKAGE EXPORTS
+# Resolved from their submodule on first access (PEP 562), so GUI-free entry points such as
+# `python -m modules.headless` never import Qt, the generated UI or resources_rc.
+_EXPORTS = {
+    # GUI FILE
+    "Ui_MainWindow": "ui_main",
 
-# APP SETTINGS
-from . app_settings import Settings
+    # APP SETTINGS
+    "Settings": "app_settings",
 
-# IMPORT FUNCTIONS
-from . ui_functions import *
+    # IMPORT FUNCTIONS
+    "UIFunctions": "ui_functions",
 
-# APP FUNCTIONS
-from . app_functions import *
+    # APP FUNCTIONS
+    "AppFunctions": "app_functions",
+
+    # UI TIMERS
+    "MeasuredTimer": "ui_timers",
+
+    # CAPTURE
+    "Frame": "capture",
+    "FrameBuffer": "capture",
+    "CaptureWorker": "capture",
+
+    # INFERENCE
+    "DetectionResult": "inference",
+    "InferenceWorker": "inference",
+
+    "AdaptiveCadence": "adaptive",
+    "MotionGate": "motion",
+    "BoxTracker": "tracker",
+
+    # BACKENDS
+    "TorchBackend": "backends",
+    "OnnxBackend": "backends",
+    "load_backend": "backends",
+
+    # DETECTORS
+    "Detector": "detectors",
+    "DetectorEngine": "detectors",
+    "letterbox_shape": "detectors",
+    "class_ids": "detectors",
+    "present_classes": "detectors",
+    "select_boxes": "detectors",
+
+    # MODEL REGISTRY
+    "ModelRegistry": "model_registry",
+    "ModelRegistryError": "model_registry",
+
+    # STARTUP
+    "StartupProfile": "profiling",
+    "startup_profile": "profiling",
+    "LazyModule": "lazy",
+    "lazy_import": "lazy",
+    "LoadedModels": "model_loader",
+    "ModelLoader": "model_loader",
+
+    # ALERTS
+    "AlertPlayer": "alerts",
+
+    # METRICS
+    "RingSeries": "metrics",
+    "Rollup": "metrics",
+    "MetricsStore": "metrics",
+
+    # SESSION HISTORY
+    "SessionStore": "session_store",
+
+    # SCORING
+    "Presence": "scoring",
+    "ScoreEvent": "scoring",
+    "ScoreUpdate": "scoring",
+    "ScoringRules": "scoring",
+    "ScoringEngine": "scoring",
+    "score_timeline": "scoring",
+
+    # PIPELINE
+    "DetectionPipeline": "pipeline",
+    "ScoredResult": "pipeline",
+    "CameraSession": "pipeline",
+    "MultiCameraPipeline": "pipeline",
+    "InferenceScheduler": "scheduler",
+
+    # OFFLINE ANALYSIS
+    "analyze_video": "video_analyzer",
+}
+
+__all__ = list(_EXPORTS) # A star import resolves every entry, entry points import the names they use
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{_EXPORTS[name]}", __name__), name)
+    globals()[name] = value
+    return value
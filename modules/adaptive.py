@@ -0,0 +1,93 @@
+import math
+import threading
+
+
+class AdaptiveCadence():
+    # PICKS HOW OFTEN (AND OPTIONALLY AT WHAT INPUT SIZE) TO RUN DETECTION FROM MEASURED COST
+    # With per-frame inference latency L and capture rate F, running every Nth frame keeps
+    # inference busy L * F / N of the time; N is chosen so that stays under `cpu_budget`.
+    # A `target_latency` (seconds) and `adapt_resolution` let it shrink the input instead when
+    # skipping alone can't keep up, and grow it back once there is headroom.
+    SIZES = (640, 512, 416, 320)
+    SETTLE = 10 # Observations a lower skip must be wanted before it is applied
+
+    def __init__(self, engine=None, cpu_budget=0.5, target_latency=0, min_skip=1, max_skip=10, adapt_resolution=False):
+        self.engine = engine
+        self.cpu_budget = cpu_budget
+        self.target_latency = target_latency
+        self.min_skip = min_skip
+        self.max_skip = max_skip
+        self.adapt_resolution = adapt_resolution and engine is not None
+        self.skip = min_skip
+        self.latency = None # Smoothed seconds per inference
+        self.capture_fps = None # Smoothed camera rate seen through frame indices/timestamps
+        self.utilization = 0.0
+        self._lower_votes = 0
+        self._last_frame = None
+        self._lock = threading.Lock()
+
+    @property
+    def size(self):
+        return self.engine.size if self.engine is not None else None
+
+    def _smooth(self, previous, value, alpha=0.2):
+        return value if previous is None else previous + alpha * (value - previous)
+
+    def observe(self, frame, latency):
+        # Called after every inference with the frame it ran on, returns the frame skip to use next
+        with self._lock:
+            self.latency = self._smooth(self.latency, latency)
+            if self._last_frame is not None and frame.timestamp > self._last_frame.timestamp:
+                fps = (frame.index - self._last_frame.index) / (frame.timestamp - self._last_frame.timestamp)
+                self.capture_fps = self._smooth(self.capture_fps, fps)
+            self._last_frame = frame
+            if not self.capture_fps:
+                return self.skip
+
+            wanted = math.ceil(self.latency * self.capture_fps / self.cpu_budget)
+            wanted = max(self.min_skip, min(self.max_skip, wanted))
+            if wanted > self.skip:
+                self.skip = wanted # Falling behind, back off immediately
+                self._lower_votes = 0
+            elif wanted < self.skip:
+                self._lower_votes += 1
+                if self._lower_votes >= self.SETTLE: # Only speed up once the headroom is stable
+                    self.skip = wanted
+                    self._lower_votes = 0
+            self.utilization = self.latency * self.capture_fps / self.skip
+
+            if self.adapt_resolution:
+                self._adapt_size(wanted)
+            return self.skip
+
+    def _adapt_size(self, wanted):
+        sizes = self.SIZES
+        i = sizes.index(self.engine.size) if self.engine.size in sizes else 0
+        too_slow = wanted >= self.max_skip or (self.target_latency and self.latency > self.target_latency)
+        headroom = (
+            self.skip == self.min_skip and self.utilization < self.cpu_budget * 0.5
+            and (not self.target_latency or self.latency < self.target_latency * 0.5)
+        )
+        if too_slow and i + 1 < len(sizes):
+            self._resize(sizes[i + 1])
+        elif headroom and i > 0:
+            self._resize(sizes[i - 1])
+
+    def _resize(self, size):
+        self.engine.size = size
+        self.latency = None # Old measurements don't apply to the new input size
+        self._lower_votes = 0
+
+    def state(self):
+        return {
+            "frame_skip": self.skip,
+            "input_size": self.size,
+            "latency_ms": round((self.latency or 0) * 1000, 1),
+            "capture_fps": round(self.capture_fps or 0, 1),
+            "utilization": round(self.utilization, 2),
+        }
+
+    def describe(self):
+        s = self.state()
+        size = f" | {s['input_size']}px" if s["input_size"] else ""
+        return f"skip {s['frame_skip']}{size} | infer {s['latency_ms']:.0f} ms | cam {s['capture_fps']:.0f} fps | load {s['utilization']:.0%}"
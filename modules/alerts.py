@@ -0,0 +1,65 @@
+import queue
+import threading
+import time
+
+from . lazy import lazy_import
+
+pygame = lazy_import("pygame")
+
+
+class AlertPlayer():
+    # PLAYS THE ALERT SOUND ON A BACKGROUND AUDIO THREAD
+    # The mixer is initialized and the sound decoded once, play() only enqueues and never blocks
+    def __init__(self, path, cooldown=3.0):
+        self.path = path
+        self.cooldown = cooldown # Seconds before the same alert reason may sound again
+        self.played = 0
+        self.suppressed = 0
+        self._last_played = {} # reason -> time.monotonic() of last accepted alert
+        self._requests = queue.Queue(maxsize=1) # At most one alert waits for the audio thread
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="AlertPlayer", daemon=True)
+            self._thread.start()
+
+    def play(self, reason="alert"):
+        now = time.monotonic()
+        if now - self._last_played.get(reason, float("-inf")) < self.cooldown:
+            self.suppressed += 1
+            return False
+        try:
+            self._requests.put_nowait(reason)
+        except queue.Full:
+            self.suppressed += 1
+            return False
+        self._last_played[reason] = now
+        return True
+
+    def stats(self):
+        return {"played": self.played, "suppressed": self.suppressed}
+
+    def _load(self):
+        pygame.mixer.init()
+        try:
+            sound = pygame.mixer.Sound(self.path) # Decoded once into memory
+            return sound.play, lambda: sound.get_num_channels() > 0
+        except pygame.error:
+            # Older SDL_mixer builds can't decode mp3 into a Sound, stream it instead
+            pygame.mixer.music.load(self.path)
+            return pygame.mixer.music.play, pygame.mixer.music.get_busy
+
+    def _run(self):
+        try:
+            play, busy = self._load()
+        except Exception as e:
+            print(f"Alert sound unavailable ({e})")
+            return
+        while True:
+            self._requests.get()
+            if busy():
+                self.suppressed += 1 # Playback is asynchronous, drop alerts that arrive while the sound is still playing
+                continue
+            play()
+            self.played += 1
@@ -1,8 +1,10 @@
-# MAIN FILE
-from main import *
+# QT AND APP SETTINGS
+from PySide6.QtWidgets import QMainWindow
+
+from . app_settings import Settings
 
 # WITH ACCESS TO MAIN WINDOW WIDGETS
-class AppFunctions(MainWindow):
+class AppFunctions(QMainWindow):
     def setThemeHack(self):
         Settings.BTN_LEFT_BOX_COLOR = "background-color: #495474;"
         Settings.BTN_RIGHT_BOX_COLOR = "background-color: #495474;"
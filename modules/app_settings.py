@@ -1,3 +1,5 @@
+import os
+
 class Settings():
     # APP SETTINGS
     ENABLE_CUSTOM_TITLE_BAR = True
@@ -15,3 +17,62 @@ class Settings():
     border-left: 22px solid qlineargradient(spread:pad, x1:0.034, y1:0, x2:0.216, y2:0, stop:0.499 rgba(118, 172, 219, 255), stop:0.5 rgba(85, 170, 255, 0));
     background-color: rgb(40, 44, 52);
     """
+
+    # CAPTURE
+    CAMERA_INDEX = 0
+    FRAME_WIDTH = 640
+    FRAME_HEIGHT = 480
+    CAPTURE_BUFFER_SIZE = 4
+
+    # INFERENCE
+    INFERENCE_WORKERS = 1
+    FRAME_SKIP = 2 # Run detection on every Nth captured frame
+    ADAPTIVE_CADENCE = True # Retune the frame skip from measured inference latency, FRAME_SKIP is the minimum
+    CPU_BUDGET = 0.5 # Target fraction of wall time spent in inference
+    TARGET_LATENCY = 0 # Seconds per inference before shrinking the input size, 0 disables
+    ADAPTIVE_RESOLUTION = False # Let the cadence step the input size down (640 -> 320) and back up
+    MAX_FRAME_SKIP = 10
+    DEBUG_OVERLAY = False # Draw the current cadence decisions on the video
+    DISPLAY_MAX_FPS = 30 # Cap on frames shown, the frame pump otherwise follows the capture thread
+    VIDEO_SURFACE = "opengl" # opengl (texture + line geometry, Mesa works) or raster (QPainter), falls back to raster
+    MOTION_GATE = True # Reuse the last detections while the scene is static
+    MOTION_THRESHOLD = 0.02 # Fraction of thumbnail pixels that must change to re-run detection
+    MOTION_PIXEL_DELTA = 12 # Gray levels a thumbnail pixel must move to count as changed
+    MOTION_MAX_STALENESS = 2.0 # Seconds before detection re-runs regardless of motion
+    DROWSINESS_ROI = True # Run the drowsiness model on the person crop instead of the full frame
+    ROI_SIZE = 320 # Square input size for the person crop
+    ROI_MARGIN = 0.15 # Fraction of the person box added on every side of the crop
+    TRACKING = True # Keep person/phone boxes alive between detector runs with a Kalman/IoU tracker
+    TRACK_IOU = 0.3 # Minimum IoU to match a detection to an existing track
+    TRACK_MAX_AGE = 1.0 # Seconds a track survives without a matching detection
+    MAX_BATCH = 4 # Frames from different cameras batched into one forward pass
+    CONCURRENT_DETECTORS = False # Run both detectors in parallel on the shared tensor
+    INFERENCE_BACKEND = "auto" # torch, onnx, openvino or auto (PyTorch on CUDA, otherwise best available ONNX provider)
+    INFERENCE_THREADS = 0 # 0 lets the runtime decide
+    MODEL_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "focusguardian")
+    MODEL_VERSION = "v7.0" # ultralytics/yolov5 release the cached hub code and weights come from
+    INFERENCE_PRECISION = "fp32" # fp32, int8-dynamic or int8-static (ONNX backends only)
+    CALIBRATION_DIR = os.path.join(MODEL_CACHE_DIR, "calibration") # Recorded webcam frames for int8-static
+
+    # SCORING - time based, every rate is per second so results don't depend on the frame rate
+    PENALTY_PER_SECOND = 10.0 # Productivity lost per second of each active distraction
+    RECOVERY_PER_SECOND = 5.0 # Productivity regained per second, always applied
+    ALERT_AFTER = {"away": 2.0, "phone": 2.0, "drowsy": 6.0} # Seconds of continuous distraction between alerts
+    MAX_PRODUCTIVITY = 101.0
+    MIN_PRODUCTIVITY = None # No floor, productivity can go negative
+    MAX_SCORE_GAP = 2.0 # Longer gaps between detections (camera stall) count as this many seconds
+
+    # ALERTS
+    ALERT_SOUND = "radar.mp3"
+    ALERT_COOLDOWN = 3.0 # Seconds before the same kind of alert can sound again
+
+    # PRODUCTIVITY GRAPH
+    GRAPH_MAX_POINTS = 600 # Older history is downsampled past this many points
+    GRAPH_MAX_FPS = 5
+
+    # METRICS
+    METRICS_CAPACITY = 3600 # Raw samples kept per metric
+
+    # SESSION HISTORY
+    SESSION_DB = os.path.join(os.path.expanduser("~"), ".local", "share", "focusguardian", "sessions.db")
+    SESSION_BATCH_SIZE = 200 # Detection rows per transaction
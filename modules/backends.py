@@ -0,0 +1,196 @@
+import glob
+import json
+import os
+import sys
+
+from . lazy import lazy_import
+
+cv2 = lazy_import("cv2")
+torch = lazy_import("torch")
+torchvision = lazy_import("torchvision")
+
+# INFERENCE BACKENDS
+# A backend takes the shared letterboxed tensor and returns the raw (1, n, 5 + classes) prediction
+class TorchBackend():
+    name = "torch"
+
+    def __init__(self, network):
+        self.network = network
+
+    def __call__(self, tensor):
+        with torch.inference_mode():
+            y = self.network(tensor)
+        if isinstance(y, (list, tuple)):
+            y = y[0]
+        return y
+
+
+class OnnxBackend():
+    name = "onnx"
+
+    def __init__(self, path, threads=0, provider="CPUExecutionProvider"):
+        import onnxruntime
+
+        options = onnxruntime.SessionOptions()
+        if threads:
+            options.intra_op_num_threads = threads
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        providers = [provider, "CPUExecutionProvider"] if provider != "CPUExecutionProvider" else [provider]
+        self.path = path
+        self.session = onnxruntime.InferenceSession(path, options, providers=providers)
+        self.input_name = self.session.get_inputs()[0].name
+        if provider == "OpenVINOExecutionProvider":
+            self.name = "openvino"
+
+    def __call__(self, tensor):
+        return torch.from_numpy(self.session.run(None, {self.input_name: tensor.cpu().numpy()})[0])
+
+
+# ONNX EXPORT
+def onnx_path(cache_dir, name, fingerprint):
+    return os.path.join(cache_dir, "onnx", f"{name}-{fingerprint[:12]}.onnx")
+
+
+def export_onnx(network, path, shape, opset=12):
+    # Exports the DetectionModel inside DetectMultiBackend with a single output tensor
+    model = getattr(network, "model", network)
+    detect_layers = [m for m in model.modules() if type(m).__name__ == "Detect"]
+    previous = [(m.inplace, m.export, getattr(m, "dynamic", False)) for m in detect_layers]
+    for m in detect_layers:
+        m.inplace, m.export, m.dynamic = False, True, True
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    dummy = torch.zeros(1, 3, *shape, device=next(model.parameters()).device).float()
+    tmp_path = path + ".tmp"
+    try:
+        torch.onnx.export(
+            model.float(), dummy, tmp_path, opset_version=opset, do_constant_folding=True,
+            input_names=["images"], output_names=["output0"],
+            dynamic_axes={"images": {0: "batch", 2: "height", 3: "width"}, "output0": {0: "batch", 1: "anchors"}},
+        )
+        os.replace(tmp_path, path) # Only a complete export ever lands in the cache
+    finally:
+        for m, (inplace, export, dynamic) in zip(detect_layers, previous):
+            m.inplace, m.export, m.dynamic = inplace, export, dynamic
+    return path
+
+
+def load_backend(kind, name, network, fingerprint, shape, cache_dir, threads=0, precision="fp32", calibration_dir=None, device=None):
+    # kind is "torch", "onnx", "openvino" or "auto"; anything but torch falls back to torch when unavailable
+    # precision is "fp32" or one of the INT8 modes in modules.quantize, which only apply to ONNX backends
+    # device is where the PyTorch model lives: "auto" keeps a CUDA model on PyTorch, explicit ONNX runs on CUDA when ORT can
+    cuda = device is not None and torch.device(device).type == "cuda"
+    if kind == "torch" or (kind == "auto" and cuda):
+        return TorchBackend(network)
+    try:
+        import onnxruntime
+    except ImportError:
+        print(f"onnxruntime not installed, running {name} on PyTorch", file=sys.stderr)
+        return TorchBackend(network)
+
+    provider = "CPUExecutionProvider"
+    available = onnxruntime.get_available_providers()
+    if cuda and "CUDAExecutionProvider" in available:
+        provider = "CUDAExecutionProvider"
+    elif kind in ("openvino", "auto") and "OpenVINOExecutionProvider" in available:
+        provider = "OpenVINOExecutionProvider"
+
+    path = onnx_path(cache_dir, name, fingerprint)
+    try:
+        if not os.path.exists(path):
+            print(f"Exporting {name} to {path}", file=sys.stderr)
+            export_onnx(network, path, shape)
+        if precision != "fp32":
+            from . quantize import quantize_model
+            try:
+                path = quantize_model(path, precision, calibration_dir)
+            except Exception as e:
+                print(f"{precision} quantization failed for {name} ({e}), running FP32", file=sys.stderr)
+        return OnnxBackend(path, threads, provider)
+    except Exception as e:
+        print(f"ONNX backend unavailable for {name} ({e}), running on PyTorch", file=sys.stderr)
+        return TorchBackend(network)
+
+
+# PARITY CHECK
+def frame_paths(folder, limit=None):
+    paths = sorted(p for ext in ("jpg", "jpeg", "png", "bmp") for p in glob.glob(os.path.join(folder, f"*.{ext}")))
+    return paths[:limit] if limit else paths
+
+
+def load_frames(folder, limit=None):
+    return [(p, cv2.imread(p)) for p in frame_paths(folder, limit)]
+
+
+def match_boxes(reference, candidate, iou_thres=0.5):
+    # Greedy same-class matching, returns (matched, mean iou, max confidence delta)
+    if not len(reference) or not len(candidate):
+        return 0, 0.0, 0.0
+    ious = torchvision.ops.box_iou(reference[:, :4], candidate[:, :4])
+    ious[reference[:, 5:6] != candidate[:, 5].unsqueeze(0)] = 0
+    matched, iou_sum, conf_delta = 0, 0.0, 0.0
+    for i in range(len(reference)):
+        j = int(ious[i].argmax())
+        if ious[i, j] >= iou_thres:
+            matched += 1
+            iou_sum += float(ious[i, j])
+            conf_delta = max(conf_delta, abs(float(reference[i, 4] - candidate[j, 4])))
+            ious[:, j] = 0
+    return matched, iou_sum / max(matched, 1), conf_delta
+
+
+def parity_report(reference, candidate, frames, iou_thres=0.5):
+    # reference and candidate are DetectorEngines wrapping the same models on different backends
+    report = {}
+    for path, image in frames:
+        for ref_pred, cand_pred, detector in zip(reference.run(image), candidate.run(image), reference.detectors):
+            stats = report.setdefault(detector.name, {"reference": 0, "candidate": 0, "matched": 0, "iou_sum": 0.0, "max_conf_delta": 0.0})
+            matched, mean_iou, conf_delta = match_boxes(ref_pred, cand_pred, iou_thres)
+            stats["reference"] += len(ref_pred)
+            stats["candidate"] += len(cand_pred)
+            stats["matched"] += matched
+            stats["iou_sum"] += mean_iou * matched
+            stats["max_conf_delta"] = max(stats["max_conf_delta"], conf_delta)
+
+    for stats in report.values():
+        stats["mean_iou"] = round(stats.pop("iou_sum") / max(stats["matched"], 1), 4)
+        stats["recall"] = round(stats["matched"] / max(stats["reference"], 1), 4)
+        stats["max_conf_delta"] = round(stats["max_conf_delta"], 4)
+    return report
+
+
+def parity_passed(report, min_recall=0.95, min_iou=0.9):
+    return all(s["recall"] >= min_recall and s["mean_iou"] >= min_iou for s in report.values())
+
+
+def parity_engines(registry, kind="onnx"):
+    # PyTorch reference and `kind` candidate engines over the cached models
+    from . app_settings import Settings
+    from . detectors import Detector, DetectorEngine, letterbox_shape
+
+    model = registry.load("yolov5s")
+    model.classes = [0, 67]
+    model_2 = registry.load("drowsiness")
+    sources = [("objects", model, registry.sha256("yolov5s")), ("drowsiness", model_2, registry.sha256("drowsiness"))]
+
+    shape = letterbox_shape((Settings.FRAME_HEIGHT, Settings.FRAME_WIDTH))
+    reference = DetectorEngine([Detector(name, m) for name, m, _ in sources])
+    candidate = DetectorEngine([
+        Detector(name, m, load_backend(kind, name, m.model, fingerprint, shape, Settings.MODEL_CACHE_DIR, Settings.INFERENCE_THREADS))
+        for name, m, fingerprint in sources
+    ])
+    return reference, candidate
+
+
+if __name__ == "__main__":
+    # python -m modules.backends <frames folder> [backend]
+    # Compares PyTorch boxes against the exported backend on recorded frames, exits 1 on mismatch
+    from modules.app_settings import Settings
+    from modules.model_registry import ModelRegistry
+
+    folder = sys.argv[1]
+    kind = sys.argv[2] if len(sys.argv) > 2 else "onnx"
+    reference, candidate = parity_engines(ModelRegistry(Settings.MODEL_CACHE_DIR, Settings.MODEL_VERSION), kind)
+    report = parity_report(reference, candidate, load_frames(folder))
+    print(json.dumps(report, indent=2))
+    sys.exit(0 if parity_passed(report) else 1)
@@ -0,0 +1,136 @@
+import threading
+import time
+from collections import deque, namedtuple
+
+from . lazy import lazy_import
+
+cv2 = lazy_import("cv2")
+
+# A CAPTURED FRAME - index is monotonic per capture session, timestamp is time.monotonic()
+Frame = namedtuple("Frame", ["index", "timestamp", "image"])
+
+
+class FrameBuffer():
+    # FIXED SIZE RING BUFFER, DROPS THE OLDEST FRAME WHEN FULL
+    def __init__(self, capacity=4):
+        self.capacity = capacity
+        self._frames = deque(maxlen=capacity)
+        self._cond = threading.Condition()
+        self._next_index = 0
+        self._last_read = -1
+        self.dropped = 0 # Frames evicted before any consumer read them
+        self.on_push = None # Optional callback after every push, e.g. to wake a scheduler watching many buffers
+
+    def push(self, image, timestamp=None):
+        if timestamp is None:
+            timestamp = time.monotonic()
+        with self._cond:
+            if len(self._frames) == self.capacity and self._frames[0].index > self._last_read:
+                self.dropped += 1
+            frame = Frame(self._next_index, timestamp, image)
+            self._frames.append(frame)
+            self._next_index += 1
+            self._cond.notify_all()
+        if self.on_push is not None:
+            self.on_push()
+        return frame
+
+    def latest(self, after=-1):
+        # Non-blocking, returns the freshest frame newer than `after` or None
+        with self._cond:
+            if not self._frames or self._frames[-1].index <= after:
+                return None
+            frame = self._frames[-1]
+            self._last_read = max(self._last_read, frame.index)
+            return frame
+
+    def wait_latest(self, after=-1, timeout=None):
+        # Blocks until a frame newer than `after` arrives (or timeout), then returns the freshest one
+        with self._cond:
+            self._cond.wait_for(lambda: self._frames and self._frames[-1].index > after, timeout)
+        return self.latest(after)
+
+    def depth(self):
+        with self._cond:
+            return len(self._frames)
+
+    def clear(self):
+        with self._cond:
+            self._frames.clear()
+
+
+class CaptureWorker():
+    # OWNS THE cv2.VideoCapture AND READS IT ON A BACKGROUND THREAD
+    def __init__(self, source=0, width=640, height=480, buffer_size=4):
+        self.source = source
+        self.width = width
+        self.height = height
+        self.buffer = FrameBuffer(buffer_size)
+        self.fps = 0.0
+        self.frames_captured = 0
+        self.finished = threading.Event() # Set when a video file source runs out of frames
+        self._running = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._running.set()
+        self._thread = threading.Thread(target=self._run, name="CaptureWorker", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._running.clear()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+            self._thread = None
+        self.buffer.clear()
+
+    def is_running(self):
+        return self._thread is not None and self._running.is_set()
+
+    def stats(self):
+        return {
+            "fps": round(self.fps, 1),
+            "captured": self.frames_captured,
+            "dropped": self.buffer.dropped,
+            "queue_depth": self.buffer.depth(),
+        }
+
+    def is_file(self):
+        return isinstance(self.source, str) and not self.source.isdigit()
+
+    def _run(self):
+        cap = cv2.VideoCapture(self.source)
+        cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.width)
+        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.height)
+
+        # Video files play back at their own frame rate and are stamped with video time on the monotonic clock,
+        # so time-based scoring sees the recording's real durations whatever the decode speed
+        file_fps = (cap.get(cv2.CAP_PROP_FPS) or 30.0) if self.is_file() else None
+        playback_start = window_start = time.monotonic()
+        window_frames = 0
+        try:
+            while self._running.is_set():
+                ret, image = cap.read()
+                now = time.monotonic()
+                if not ret:
+                    if self.is_file():
+                        self.finished.set() # End of a video file
+                        break
+                    time.sleep(0.01) # Camera stalled, don't spin
+                    continue
+                if file_fps:
+                    now = playback_start + self.frames_captured / file_fps
+                    time.sleep(max(0.0, now - time.monotonic()))
+                self.buffer.push(image, now)
+                self.frames_captured += 1
+
+                # FPS over a rolling one second window
+                window_frames += 1
+                if now - window_start >= 1.0:
+                    self.fps = window_frames / (now - window_start)
+                    window_start = now
+                    window_frames = 0
+        finally:
+            cap.release()
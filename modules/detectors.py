@@ -0,0 +1,289 @@
+import math
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from . backends import TorchBackend
+from . lazy import lazy_import
+
+cv2 = lazy_import("cv2")
+np = lazy_import("numpy")
+torch = lazy_import("torch")
+torchvision = lazy_import("torchvision")
+
+# YOLOv5 PRE/POST PROCESSING
+# Mirrors what AutoShape does internally so the letterboxed tensor can be built once and shared
+def make_divisible(x, divisor):
+    return math.ceil(x / divisor) * divisor
+
+
+def letterbox_shape(image_shape, size=640, stride=32):
+    # Same target shape AutoShape picks for a single image
+    gain = size / max(image_shape[:2])
+    return tuple(make_divisible(x * gain, stride) for x in image_shape[:2])
+
+
+def letterbox(image, new_shape, color=(114, 114, 114)):
+    h, w = image.shape[:2]
+    r = min(new_shape[0] / h, new_shape[1] / w)
+    new_unpad = int(round(w * r)), int(round(h * r))
+    dw, dh = (new_shape[1] - new_unpad[0]) / 2, (new_shape[0] - new_unpad[1]) / 2
+
+    if (w, h) != new_unpad:
+        image = cv2.resize(image, new_unpad, interpolation=cv2.INTER_LINEAR)
+    top, bottom = int(round(dh - 0.1)), int(round(dh + 0.1))
+    left, right = int(round(dw - 0.1)), int(round(dw + 0.1))
+    if top or bottom or left or right:
+        image = cv2.copyMakeBorder(image, top, bottom, left, right, cv2.BORDER_CONSTANT, value=color)
+    return image
+
+
+def preprocess(image, size=640, stride=32, device="cpu", shape=None):
+    shape = shape or letterbox_shape(image.shape, size, stride)
+    padded = letterbox(image, shape)
+    tensor = torch.from_numpy(np.ascontiguousarray(padded.transpose((2, 0, 1))[None])).to(device)
+    return tensor.float().div_(255), shape
+
+
+def xywh2xyxy(x):
+    y = x.clone()
+    y[:, 0] = x[:, 0] - x[:, 2] / 2
+    y[:, 1] = x[:, 1] - x[:, 3] / 2
+    y[:, 2] = x[:, 0] + x[:, 2] / 2
+    y[:, 3] = x[:, 1] + x[:, 3] / 2
+    return y
+
+
+def non_max_suppression(prediction, conf_thres=0.25, iou_thres=0.45, classes=None, max_det=1000):
+    # Returns one (n, 6) tensor per image: x1, y1, x2, y2, conf, cls
+    max_wh = 7680 # Class offset so boxes of different classes never suppress each other
+    max_nms = 30000
+    output = []
+    for x in prediction:
+        x = x[x[:, 4] > conf_thres]
+        if not x.shape[0]:
+            output.append(torch.zeros((0, 6), device=prediction.device))
+            continue
+        x[:, 5:] *= x[:, 4:5] # conf = obj_conf * cls_conf
+        box = xywh2xyxy(x[:, :4])
+        conf, j = x[:, 5:].max(1, keepdim=True)
+        x = torch.cat((box, conf, j.float()), 1)[conf.view(-1) > conf_thres]
+        if classes is not None:
+            x = x[(x[:, 5:6] == torch.tensor(classes, device=x.device)).any(1)]
+        if not x.shape[0]:
+            output.append(torch.zeros((0, 6), device=prediction.device))
+            continue
+        x = x[x[:, 4].argsort(descending=True)[:max_nms]]
+        offsets = x[:, 5:6] * max_wh
+        keep = torchvision.ops.nms(x[:, :4] + offsets, x[:, 4], iou_thres)[:max_det]
+        output.append(x[keep])
+    return output
+
+
+def scale_boxes(letterbox_shape, boxes, image_shape):
+    gain = min(letterbox_shape[0] / image_shape[0], letterbox_shape[1] / image_shape[1])
+    pad_x = (letterbox_shape[1] - image_shape[1] * gain) / 2
+    pad_y = (letterbox_shape[0] - image_shape[0] * gain) / 2
+    boxes[:, [0, 2]] -= pad_x
+    boxes[:, [1, 3]] -= pad_y
+    boxes[:, :4] /= gain
+    boxes[:, [0, 2]] = boxes[:, [0, 2]].clamp(0, image_shape[1])
+    boxes[:, [1, 3]] = boxes[:, [1, 3]].clamp(0, image_shape[0])
+    return boxes
+
+
+def best_box(pred, cls):
+    # Highest confidence box of one class, or None
+    boxes = pred[pred[:, 5] == cls]
+    if not boxes.shape[0]:
+        return None
+    return boxes[boxes[:, 4].argmax(), :4].tolist()
+
+
+def roi_bounds(box, image_shape, margin=0.15, min_size=32):
+    # Box grown by `margin` of its size on every side and clipped to the image, None when too small to crop
+    x1, y1, x2, y2 = box
+    dx, dy = (x2 - x1) * margin, (y2 - y1) * margin
+    h, w = image_shape[:2]
+    x1, y1 = max(0, int(x1 - dx)), max(0, int(y1 - dy))
+    x2, y2 = min(w, int(math.ceil(x2 + dx))), min(h, int(math.ceil(y2 + dy)))
+    if x2 - x1 < min_size or y2 - y1 < min_size:
+        return None
+    return x1, y1, x2, y2
+
+
+# VECTORIZED POST-PROCESSING
+# Predictions may be torch tensors (detectors) or NumPy arrays (tracker), both become NumPy views without a copy
+def class_ids(names, labels):
+    # Class index of each label, -1 when the model doesn't know it
+    lookup = {name: int(i) for i, name in (names.items() if isinstance(names, dict) else enumerate(names))}
+    return np.array([lookup.get(label, -1) for label in labels])
+
+
+def confident(pred, conf_thres=0.1):
+    pred = np.asarray(pred).reshape(-1, 6)
+    return pred[pred[:, 4] > conf_thres]
+
+
+def present_classes(pred, ids, conf_thres=0.1):
+    # One flag per class id, True when at least one box of that class clears the threshold
+    return (confident(pred, conf_thres)[:, 5, None] == ids[None, :]).any(0)
+
+
+def select_boxes(pred, ids=None, conf_thres=0.1):
+    # Integer boxes, confidences and classes of the confident boxes whose class is in `ids` (any class when None)
+    pred = confident(pred, conf_thres)
+    if ids is not None:
+        pred = pred[np.isin(pred[:, 5], ids)]
+    return pred[:, :4].astype(int), pred[:, 4], pred[:, 5].astype(int)
+
+
+class Detector():
+    # ONE YOLOv5 MODEL BEHIND A RAW FORWARD PASS, WITH THE AUTOSHAPE THRESHOLDS
+    def __init__(self, name, model, backend=None):
+        self.name = name
+        self.autoshape = model
+        self.names = model.names
+        self.stride = int(getattr(model, "stride", 32))
+        self.network = model.model # DetectMultiBackend, skips AutoShape's own preprocessing
+        self.backend = backend or TorchBackend(self.network)
+        self.half = self.backend.name == "torch" and bool(getattr(self.network, "fp16", False))
+
+    @property
+    def conf(self):
+        return self.autoshape.conf
+
+    @property
+    def iou(self):
+        return self.autoshape.iou
+
+    @property
+    def classes(self):
+        return self.autoshape.classes
+
+    @property
+    def max_det(self):
+        return self.autoshape.max_det
+
+    def forward(self, tensor):
+        return self.backend(tensor)
+
+    def postprocess(self, raw, shape, image_shapes):
+        # One prediction per image in the batch, boxes scaled back to each source image
+        preds = non_max_suppression(raw, self.conf, self.iou, self.classes, self.max_det)
+        return [scale_boxes(shape, pred, image_shape).cpu() for pred, image_shape in zip(preds, image_shapes)]
+
+
+class DetectorEngine():
+    # PREPROCESSES EACH FRAME ONCE AND DISPATCHES THE SHARED TENSOR TO EVERY DETECTOR
+    # With roi_detector set, that detector instead runs on a crop around the best `roi_class` box found by the
+    # first detector, letterboxed to roi_size x roi_size, and falls back to the full frame when there is none
+    def __init__(self, detectors, device="cpu", size=640, concurrent=False, roi_detector=None, roi_size=320, roi_class=0, roi_margin=0.15):
+        self.detectors = detectors
+        self.device = device
+        self.size = size
+        self.roi_detector = roi_detector
+        self.roi_size = roi_size
+        self.roi_class = roi_class
+        self.roi_margin = roi_margin
+        self.roi_hits = 0
+        self.roi_misses = 0
+        self.full_detectors = [d for d in detectors if d is not roi_detector]
+        self.concurrent = concurrent and len(self.full_detectors) > 1
+        self.stride = max(d.stride for d in detectors)
+        self.timings = {} # Smoothed milliseconds per stage, keyed by "preprocess" and detector name
+        self._pool = ThreadPoolExecutor(len(self.full_detectors), thread_name_prefix="Detector") if self.concurrent else None
+
+    def _record(self, key, seconds):
+        ms = seconds * 1000
+        previous = self.timings.get(key)
+        self.timings[key] = ms if previous is None else previous * 0.9 + ms * 0.1
+
+    def _run_one(self, detector, tensor, shape, image_shapes):
+        start = time.perf_counter()
+        x = tensor.half() if detector.half else tensor
+        preds = detector.postprocess(detector.forward(x), shape, image_shapes)
+        self._record(detector.name, time.perf_counter() - start)
+        return preds
+
+    def _run_detectors(self, tensor, shape, image_shapes):
+        # Returns per full-frame detector a list of predictions, one per image in the batch
+        if self._pool is not None:
+            futures = [self._pool.submit(self._run_one, d, tensor, shape, image_shapes) for d in self.full_detectors]
+            return [f.result() for f in futures]
+        return [self._run_one(d, tensor, shape, image_shapes) for d in self.full_detectors]
+
+    def _run_roi(self, images, prepared, results):
+        # Second stage: crops around the first detector's boxes batch together since they share one square shape
+        detector = self.roi_detector
+        position = self.detectors.index(detector)
+        crops, fallback = [], []
+        for i, image in enumerate(images):
+            box = best_box(results[i][0], self.roi_class)
+            bounds = roi_bounds(box, image.shape, self.roi_margin) if box is not None else None
+            if bounds is None:
+                fallback.append(i)
+            else:
+                crops.append((i, bounds))
+        self.roi_hits += len(crops)
+        self.roi_misses += len(fallback)
+
+        if crops:
+            start = time.perf_counter()
+            shape = (self.roi_size, self.roi_size)
+            regions = [images[i][y1:y2, x1:x2] for i, (x1, y1, x2, y2) in crops]
+            batch = torch.cat([preprocess(region, device=self.device, shape=shape)[0] for region in regions])
+            self._record("roi preprocess", time.perf_counter() - start)
+            preds = self._run_one(detector, batch, shape, [region.shape for region in regions])
+            for (i, (x1, y1, _, _)), pred in zip(crops, preds):
+                pred[:, [0, 2]] += x1 # Back to full-frame coordinates
+                pred[:, [1, 3]] += y1
+                results[i][position] = pred
+
+        # No person found, run on the already letterboxed full frame
+        for i in fallback:
+            tensor, shape = prepared[i]
+            results[i][position] = self._run_one(detector, tensor, shape, [images[i].shape])[0]
+
+    def run(self, image):
+        # Returns one prediction tensor per detector, in the order they were given
+        if self.roi_detector is not None:
+            return self.run_batch([image])[0]
+        start = time.perf_counter()
+        tensor, shape = preprocess(image, self.size, self.stride, self.device)
+        self._record("preprocess", time.perf_counter() - start)
+        return [preds[0] for preds in self._run_detectors(tensor, shape, [image.shape])]
+
+    def run_batch(self, images):
+        # One forward pass per detector for every group of same-sized images (e.g. several cameras)
+        # Returns, per image, one prediction tensor per detector
+        start = time.perf_counter()
+        prepared = [preprocess(image, self.size, self.stride, self.device) for image in images]
+        self._record("preprocess", time.perf_counter() - start)
+
+        groups = {}
+        for i, (_, shape) in enumerate(prepared):
+            groups.setdefault(shape, []).append(i)
+
+        positions = [self.detectors.index(d) for d in self.full_detectors]
+        results = [[None] * len(self.detectors) for _ in images]
+        for shape, indices in groups.items():
+            batch = torch.cat([prepared[i][0] for i in indices])
+            per_detector = self._run_detectors(batch, shape, [images[i].shape for i in indices])
+            for k, i in enumerate(indices):
+                for position, preds in zip(positions, per_detector):
+                    results[i][position] = preds[k]
+
+        if self.roi_detector is not None:
+            self._run_roi(images, prepared, results)
+        return results
+
+    def timing_report(self):
+        return {key: round(ms, 1) for key, ms in self.timings.items()}
+
+    def roi_report(self):
+        total = self.roi_hits + self.roi_misses
+        return {"cropped": self.roi_hits, "full_frame": self.roi_misses, "crop_ratio": round(self.roi_hits / total, 3) if total else 0.0}
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False)
@@ -0,0 +1,86 @@
+import argparse
+import json
+import sys
+import time
+
+from . app_settings import Settings
+from . model_loader import ModelLoader
+from . pipeline import DetectionPipeline, MultiCameraPipeline
+
+# HEADLESS DETECTION
+# python -m modules.headless [--source 0|video.mp4 ...] [--duration S] [--stats-interval S]
+# Runs capture -> detect -> score without Qt and writes one JSON object per line to stdout, diagnostics go to stderr.
+# Repeating --source runs several cameras through one shared, batched inference scheduler.
+
+
+def emit(event, **fields):
+    sys.stdout.write(json.dumps({"event": event, "time": round(time.time(), 3), **fields}) + "\n")
+    sys.stdout.flush()
+
+
+def on_result(camera, scored):
+    result, presence, update = scored
+    emit(
+        "detection", camera=camera, frame=result.frame_index, latency_ms=round(result.latency * 1000, 1),
+        person=presence.person, phone=presence.phone, drowsy=presence.drowsy, productivity=update.productivity,
+    )
+    for event in update.events:
+        if event.kind == "ended":
+            emit("episode", camera=camera, reason=event.reason, seconds=round(event.value, 3))
+        elif event.kind == "alert":
+            emit("alert", camera=camera, reason=event.reason, seconds=round(event.value, 3))
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m modules.headless", description="Run FocusGuardian detection without a display.")
+    parser.add_argument("--source", action="append", help="camera index or video file, repeat for several cameras")
+    parser.add_argument("--duration", type=float, default=0, help="stop after this many seconds (0 runs until the source ends or Ctrl+C)")
+    parser.add_argument("--stats-interval", type=float, default=5.0, help="seconds between stats events")
+    parser.add_argument("--frame-skip", type=int, default=Settings.FRAME_SKIP)
+    parser.add_argument("--workers", type=int, default=Settings.INFERENCE_WORKERS, help="inference threads for a single source")
+    parser.add_argument("--max-batch", type=int, default=Settings.MAX_BATCH, help="frames per batched forward pass with several sources")
+    parser.add_argument("--refresh-models", action="store_true")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    sources = [int(s) if s.isdigit() else s for s in args.source or [str(Settings.CAMERA_INDEX)]]
+
+    def on_progress(step, total, message):
+        emit("loading", step=step, total=total, message=message)
+
+    engine = ModelLoader(on_progress, None, None, args.refresh_models).load().engine
+    if len(sources) == 1:
+        pipeline = DetectionPipeline(engine, source=sources[0], on_result=lambda scored: on_result("cam0", scored), frame_skip=args.frame_skip, workers=args.workers)
+        states = {"cam0": pipeline.state}
+    else:
+        pipeline = MultiCameraPipeline(engine, sources, on_result, args.max_batch, args.frame_skip)
+        states = {camera_id: camera.state for camera_id, camera in pipeline.cameras.items()}
+    for state in states.values():
+        state.started = True # Alerts are reported from the first frame
+    pipeline.start()
+
+    next_stats = time.monotonic() + args.stats_interval
+    try:
+        while not pipeline.finished():
+            if args.duration and time.monotonic() - pipeline.started_at >= args.duration:
+                break
+            time.sleep(0.05)
+            if time.monotonic() >= next_stats:
+                emit("stats", **pipeline.stats())
+                next_stats += args.stats_interval
+    except KeyboardInterrupt:
+        pass
+    finally:
+        pipeline.stop()
+        for camera, state in states.items():
+            emit(
+                "summary", camera=camera, productivity=state.productivity, critical_error=state.critical_error(),
+                **{f"{reason}_seconds": round(total, 3) for reason, total in state.totals.items()},
+            )
+        emit("stats", **pipeline.stats())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+import threading
+import time
+from collections import namedtuple
+
+# RESULT OF ONE DETECTION PASS - detections is whatever the detect callable returned
+DetectionResult = namedtuple("DetectionResult", ["frame_index", "timestamp", "detections", "latency"])
+
+
+class InferenceWorker():
+    # RUNS `detect(image)` ON THE LATEST CAPTURED FRAME, OFF THE GUI THREAD
+    # detect returns (detections, ran); ran is False when it reused earlier detections without running a model,
+    # those passes are published but don't count towards latency, FPS or the adaptive cadence
+    def __init__(self, frame_buffer, detect, on_result, workers=1, frame_skip=1, cadence=None):
+        self.frame_buffer = frame_buffer
+        self.cadence = cadence # Optional AdaptiveCadence that retunes frame_skip from measured latency
+        self.detect = detect
+        self.on_result = on_result
+        self.workers = max(1, workers)
+        self.frame_skip = max(1, frame_skip)
+        self.inference_fps = 0.0
+        self.last_latency = 0.0
+        self._lock = threading.Lock()
+        self._claimed_index = -1 # Last frame index handed to a worker
+        self._published_index = -1 # Last frame index whose result was published
+        self._running = threading.Event()
+        self._threads = []
+
+    def start(self):
+        if self._threads:
+            return
+        self._running.set()
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._run, name=f"InferenceWorker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self):
+        self._running.clear()
+        for thread in self._threads:
+            thread.join(timeout=5)
+        self._threads = []
+
+    def stats(self):
+        return {
+            "inference_fps": round(self.inference_fps, 1),
+            "latency_ms": round(self.last_latency * 1000, 1),
+            "workers": self.workers,
+            "frame_skip": self.frame_skip,
+        }
+
+    def _claim_frame(self):
+        # Each worker takes the freshest frame at least `frame_skip` frames past the last claimed one
+        while self._running.is_set():
+            with self._lock:
+                after = self._claimed_index + self.frame_skip - 1
+            frame = self.frame_buffer.wait_latest(after, timeout=0.1)
+            if frame is None:
+                continue
+            with self._lock:
+                if frame.index <= self._claimed_index:
+                    continue # Another worker got there first
+                self._claimed_index = frame.index
+            return frame
+        return None
+
+    def _run(self):
+        while self._running.is_set():
+            frame = self._claim_frame()
+            if frame is None:
+                break
+            start = time.perf_counter()
+            detections, ran = self.detect(frame.image)
+            latency = time.perf_counter() - start
+
+            if ran and self.cadence is not None:
+                skip = self.cadence.observe(frame, latency)
+                with self._lock:
+                    self.frame_skip = skip
+
+            with self._lock:
+                if frame.index < self._published_index:
+                    continue # A newer result was already published, drop this stale one
+                self._published_index = frame.index
+                if ran:
+                    self.last_latency = latency
+                    self.inference_fps = self.workers / latency if latency > 0 else 0.0
+            self.on_result(DetectionResult(frame.index, frame.timestamp, detections, latency))
@@ -0,0 +1,25 @@
+import importlib
+import sys
+import time
+import types
+
+from . profiling import startup_profile
+
+# LAZY IMPORTS
+# Heavy third-party modules (torch, cv2, numpy, ...) are bound at module level as LazyModule proxies and
+# only imported on first attribute access, so importing our own modules stays cheap at startup.
+class LazyModule(types.ModuleType):
+    def __getattr__(self, attr):
+        if attr.startswith("__") and attr.endswith("__"):
+            raise AttributeError(attr)
+        loaded = self.__name__ in sys.modules # Another proxy or a plain import already paid for it
+        start = time.perf_counter()
+        module = importlib.import_module(self.__name__) # Import locks make concurrent first use safe
+        if not loaded:
+            startup_profile.record(f"import {self.__name__}", start, time.perf_counter())
+        self.__dict__.update(module.__dict__) # Later lookups hit the proxy's own dict directly
+        return getattr(module, attr)
+
+
+def lazy_import(name):
+    return LazyModule(name)
@@ -0,0 +1,155 @@
+from . lazy import lazy_import
+
+np = lazy_import("numpy")
+
+# FIXED-MEMORY SESSION METRICS
+# Every metric keeps its raw samples in a preallocated ring plus per-second and per-minute rollups,
+# so memory is bounded and window queries cost O(window) however long the session runs.
+class RingSeries():
+    def __init__(self, capacity, dtype="float64"):
+        self.capacity = capacity
+        self.times = np.zeros(capacity, dtype="float64")
+        self.values = np.zeros(capacity, dtype=dtype)
+        self.count = 0 # Total appended, including overwritten samples
+
+    def __len__(self):
+        return min(self.count, self.capacity)
+
+    def append(self, t, value):
+        i = self.count % self.capacity
+        self.times[i] = t
+        self.values[i] = value
+        self.count += 1
+
+    def window(self, n=None):
+        # Last n samples, oldest first
+        n = len(self) if n is None else min(n, len(self))
+        end = self.count % self.capacity
+        idx = np.arange(end - n, end) % self.capacity
+        return self.times[idx], self.values[idx]
+
+    def last(self):
+        if not self.count:
+            return None
+        i = (self.count - 1) % self.capacity
+        return self.times[i], self.values[i]
+
+    def clear(self):
+        self.count = 0
+
+
+class Rollup():
+    # AGGREGATES SAMPLES INTO FIXED TIME BUCKETS (mean, min, max per bucket)
+    STATS = ("mean", "min", "max")
+
+    def __init__(self, interval, capacity):
+        self.interval = interval
+        self.stats = {stat: RingSeries(capacity) for stat in self.STATS}
+        self._reset_bucket(None)
+
+    def _reset_bucket(self, start):
+        self._start = start
+        self._sum = 0.0
+        self._count = 0
+        self._min = float("inf")
+        self._max = float("-inf")
+
+    @property
+    def closed(self):
+        return self.stats["mean"].count
+
+    def add(self, t, value):
+        start = t - t % self.interval
+        if self._start is not None and start != self._start:
+            self.flush()
+        if self._start is None:
+            self._start = start
+        self._sum += value
+        self._count += 1
+        self._min = min(self._min, value)
+        self._max = max(self._max, value)
+
+    def flush(self):
+        # Closes the in-progress bucket
+        if not self._count:
+            return
+        self.stats["mean"].append(self._start, self._sum / self._count)
+        self.stats["min"].append(self._start, self._min)
+        self.stats["max"].append(self._start, self._max)
+        self._reset_bucket(None)
+
+    def window(self, n=None, stat="mean"):
+        return self.stats[stat].window(n)
+
+    def clear(self):
+        for series in self.stats.values():
+            series.clear()
+        self._reset_bucket(None)
+
+
+class Metric():
+    def __init__(self, capacity, rollups):
+        self.raw = RingSeries(capacity)
+        self.rollups = {name: Rollup(interval, size) for name, interval, size in rollups}
+        self.count = 0
+        self.total = 0.0
+
+    def record(self, t, value):
+        self.raw.append(t, value)
+        for rollup in self.rollups.values():
+            rollup.add(t, value)
+        self.count += 1
+        self.total += value
+
+    def clear(self):
+        self.raw.clear()
+        for rollup in self.rollups.values():
+            rollup.clear()
+        self.count = 0
+        self.total = 0.0
+
+
+class MetricsStore():
+    # (resolution name, bucket seconds, buckets kept)
+    ROLLUPS = (("second", 1, 3600), ("minute", 60, 24 * 60))
+
+    def __init__(self, capacity=3600):
+        self.capacity = capacity
+        self.metrics = {}
+
+    def metric(self, name):
+        if name not in self.metrics:
+            self.metrics[name] = Metric(self.capacity, self.ROLLUPS)
+        return self.metrics[name]
+
+    def record(self, name, t, value):
+        self.metric(name).record(t, value)
+
+    def window(self, name, n=None, resolution="raw", stat="mean"):
+        # Returns (times, values) arrays for the last n samples or closed buckets
+        metric = self.metric(name)
+        if resolution == "raw":
+            return metric.raw.window(n)
+        return metric.rollups[resolution].window(n, stat)
+
+    def closed_buckets(self, name, resolution):
+        return self.metric(name).rollups[resolution].closed
+
+    def flush(self, name):
+        for rollup in self.metric(name).rollups.values():
+            rollup.flush()
+
+    def summary(self, name):
+        metric = self.metric(name)
+        last = metric.raw.last()
+        return {
+            "count": metric.count,
+            "total": metric.total,
+            "mean": metric.total / metric.count if metric.count else 0.0,
+            "last": float(last[1]) if last else None,
+        }
+
+    def clear(self, name=None):
+        for key, metric in self.metrics.items():
+            if name is None or key == name:
+                metric.clear()
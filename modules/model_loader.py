@@ -0,0 +1,79 @@
+import sys
+import threading
+from collections import namedtuple
+
+from . app_settings import Settings
+from . backends import load_backend
+from . detectors import Detector, DetectorEngine, letterbox_shape
+from . lazy import lazy_import
+from . model_registry import ModelRegistry
+from . profiling import startup_profile
+
+np = lazy_import("numpy")
+torch = lazy_import("torch")
+
+# EVERYTHING THE GUI NEEDS ONCE MODELS ARE READY
+LoadedModels = namedtuple("LoadedModels", ["device", "model", "model_2", "engine"])
+
+LOAD_STEPS = 5
+
+
+class ModelLoader():
+    # LOADS AND WARMS UP BOTH DETECTORS ON A BACKGROUND THREAD
+    # Callbacks run on the loader thread, the GUI forwards them through Qt signals
+    def __init__(self, on_progress, on_ready, on_error, refresh=False, threads=None):
+        self.on_progress = on_progress
+        self.on_ready = on_ready
+        self.on_error = on_error
+        self.refresh = refresh
+        self.threads = threads or Settings.INFERENCE_THREADS # Intra-op threads per backend, 0 lets the runtime decide
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="ModelLoader", daemon=True)
+        self._thread.start()
+
+    def _step(self, step, message):
+        self.on_progress(step, LOAD_STEPS, message)
+        return startup_profile.phase(message)
+
+    def _run(self):
+        try:
+            self.on_ready(self.load())
+        except Exception as e:
+            self.on_error(f"{type(e).__name__}: {e}")
+
+    def load(self, warmup=True):
+        with self._step(0, "Resolving model cache"):
+            device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+            registry = ModelRegistry(Settings.MODEL_CACHE_DIR, Settings.MODEL_VERSION)
+            if self.refresh:
+                registry.refresh()
+            print(f"Inference device: {torch.cuda.get_device_name(0) if device.type == 'cuda' else 'cpu'}", file=sys.stderr)
+
+        with self._step(1, "Loading person/phone model"):
+            model = registry.load("yolov5s", device)
+            model.classes = [0, 67]
+
+        with self._step(2, "Loading drowsiness model"):
+            model_2 = registry.load("drowsiness", device)
+
+        # Inference backend, exported to ONNX once and cached on disk when onnxruntime is available
+        with self._step(3, "Preparing inference backends"):
+            shape = letterbox_shape((Settings.FRAME_HEIGHT, Settings.FRAME_WIDTH))
+            backend = load_backend(Settings.INFERENCE_BACKEND, "objects", model.model, registry.sha256("yolov5s"), shape, Settings.MODEL_CACHE_DIR, self.threads, Settings.INFERENCE_PRECISION, Settings.CALIBRATION_DIR, device)
+            backend_2 = load_backend(Settings.INFERENCE_BACKEND, "drowsiness", model_2.model, registry.sha256("drowsiness"), shape, Settings.MODEL_CACHE_DIR, self.threads, Settings.INFERENCE_PRECISION, Settings.CALIBRATION_DIR, device)
+
+            # Both detectors share one letterboxed tensor per frame, unless drowsiness runs on the person crop
+            detectors = [Detector("objects", model, backend), Detector("drowsiness", model_2, backend_2)]
+            roi_detector = detectors[1] if Settings.DROWSINESS_ROI else None
+            engine = DetectorEngine(detectors, device, concurrent=Settings.CONCURRENT_DETECTORS, roi_detector=roi_detector, roi_size=Settings.ROI_SIZE, roi_margin=Settings.ROI_MARGIN)
+
+        # Dummy forward pass so allocator/JIT/session setup is paid before the first real frame
+        if warmup:
+            with self._step(4, "Warming up detectors"):
+                engine.run(np.zeros((Settings.FRAME_HEIGHT, Settings.FRAME_WIDTH, 3), dtype=np.uint8))
+                engine.timings.clear()
+
+        self.on_progress(LOAD_STEPS, LOAD_STEPS, "Models ready")
+        return LoadedModels(device, model, model_2, engine)
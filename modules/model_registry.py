@@ -0,0 +1,149 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import zipfile
+
+from . lazy import lazy_import
+
+torch = lazy_import("torch")
+
+# MODEL REGISTRY
+# Both detectors and the yolov5 hub code live in a versioned local cache, verified by sha256 on every load:
+#   <cache>/models/<version>/yolov5/        extracted ultralytics/yolov5 release
+#   <cache>/models/<version>/<name>.pt      weights
+#   <cache>/models/<version>/manifest.json  sha256 of every fetched artifact, and of the extracted yolov5 tree
+#                                           whose hubconf.py torch.hub executes
+HUB_ARCHIVE_URL = "https://github.com/ultralytics/yolov5/archive/refs/tags/{version}.zip"
+MODELS = {
+    "yolov5s": {"url": "https://github.com/ultralytics/yolov5/releases/download/{version}/yolov5s.pt"},
+    "drowsiness": {"source": "drowsiness.pt"}, # Shipped next to main.py
+}
+
+
+class ModelRegistryError(Exception):
+    pass
+
+
+def sha256sum(path):
+    sha = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def tree_sha256(root):
+    # One digest over every relative path and file content, bytecode caches written by imports are skipped
+    sha = hashlib.sha256()
+    for folder, dirs, files in os.walk(root):
+        dirs[:] = sorted(d for d in dirs if d != "__pycache__")
+        for name in sorted(f for f in files if not f.endswith(".pyc")):
+            path = os.path.join(folder, name)
+            sha.update(os.path.relpath(path, root).replace(os.sep, "/").encode() + b"\0")
+            sha.update(sha256sum(path).encode())
+    return sha.hexdigest()
+
+
+class ModelRegistry():
+    def __init__(self, cache_dir, version="v7.0"):
+        self.version = version
+        self.root = os.path.join(cache_dir, "models", version)
+        self.repo_dir = os.path.join(self.root, "yolov5")
+        self.manifest_path = os.path.join(self.root, "manifest.json")
+        self.manifest = self._read_manifest()
+        self._repo_verified = False
+
+    def _read_manifest(self):
+        if not os.path.exists(self.manifest_path):
+            return {}
+        with open(self.manifest_path) as f:
+            return json.load(f)
+
+    def _write_manifest(self):
+        os.makedirs(self.root, exist_ok=True)
+        tmp_path = self.manifest_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.manifest, f, indent=2)
+        os.replace(tmp_path, self.manifest_path)
+
+    def weights_path(self, name):
+        return os.path.join(self.root, f"{name}.pt")
+
+    def sha256(self, name):
+        return self.manifest[name]
+
+    def is_cached(self, name):
+        return name in self.manifest and os.path.exists(self.weights_path(name))
+
+    # FETCHING - the only code path that touches the network
+    def _fetch_repo(self):
+        os.makedirs(self.root, exist_ok=True)
+        with tempfile.TemporaryDirectory(dir=self.root) as tmp:
+            archive = os.path.join(tmp, "yolov5.zip")
+            torch.hub.download_url_to_file(HUB_ARCHIVE_URL.format(version=self.version), archive, progress=False)
+            with zipfile.ZipFile(archive) as z:
+                z.extractall(tmp)
+                top = z.namelist()[0].split("/")[0]
+            shutil.rmtree(self.repo_dir, ignore_errors=True)
+            os.replace(os.path.join(tmp, top), self.repo_dir)
+            self.manifest["yolov5-archive"] = sha256sum(archive)
+            self.manifest["yolov5-tree"] = tree_sha256(self.repo_dir)
+            self._repo_verified = True
+
+    def _fetch_weights(self, name):
+        spec = MODELS[name]
+        path = self.weights_path(name)
+        tmp_path = path + ".tmp"
+        if "url" in spec:
+            torch.hub.download_url_to_file(spec["url"].format(version=self.version), tmp_path, progress=False)
+        else:
+            if not os.path.exists(spec["source"]):
+                raise ModelRegistryError(f"{spec['source']} not found, cannot add {name} to the model cache")
+            shutil.copyfile(spec["source"], tmp_path)
+        self.manifest[name] = sha256sum(tmp_path)
+        os.replace(tmp_path, path)
+
+    def refresh(self, names=None):
+        # Explicit re-download of the hub code and weights, e.g. from `main.py --refresh-models`
+        self._fetch_repo()
+        for name in names or MODELS:
+            self._fetch_weights(name)
+        self._write_manifest()
+
+    def ensure(self, name):
+        # First run populates missing entries once, cached entries are never re-fetched implicitly
+        changed = False
+        if not os.path.exists(os.path.join(self.repo_dir, "hubconf.py")):
+            self._fetch_repo()
+            changed = True
+        if not self.is_cached(name):
+            self._fetch_weights(name)
+            changed = True
+        if changed:
+            self._write_manifest()
+
+    def verify(self, name):
+        path = self.weights_path(name)
+        if sha256sum(path) != self.manifest[name]:
+            raise ModelRegistryError(f"{path} does not match its recorded sha256, run with --refresh-models")
+        return path
+
+    def verify_repo(self):
+        # Checked once per registry, the hub code is executed by every load
+        if self._repo_verified:
+            return
+        if "yolov5-tree" not in self.manifest:
+            raise ModelRegistryError(f"{self.repo_dir} has no recorded sha256, run with --refresh-models")
+        if tree_sha256(self.repo_dir) != self.manifest["yolov5-tree"]:
+            raise ModelRegistryError(f"{self.repo_dir} does not match its recorded sha256, run with --refresh-models")
+        self._repo_verified = True
+
+    def load(self, name, device="cpu"):
+        # Loads through the cached hub code with source='local', no network access
+        self.ensure(name)
+        self.verify_repo()
+        path = self.verify(name)
+        model = torch.hub.load(self.repo_dir, "custom", path=path, source="local", _verbose=False)
+        return model.to(device)
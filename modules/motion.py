@@ -0,0 +1,57 @@
+import threading
+import time
+
+from . lazy import lazy_import
+
+cv2 = lazy_import("cv2")
+np = lazy_import("numpy")
+
+
+class MotionGate():
+    # DECIDES WHETHER A FRAME CHANGED ENOUGH SINCE THE LAST INFERRED ONE TO RUN DETECTION AGAIN
+    # Frames are compared as small blurred grayscale thumbnails: a pixel counts as changed when it moved
+    # more than `pixel_delta` levels, and the frame when more than `threshold` of its pixels changed.
+    # Detection always re-runs once the previous result is older than `max_staleness` seconds.
+    def __init__(self, threshold=0.02, pixel_delta=12, max_staleness=2.0, size=(64, 48)):
+        self.threshold = threshold
+        self.pixel_delta = pixel_delta
+        self.max_staleness = max_staleness
+        self.size = size
+        self.checked = 0
+        self.skipped = 0
+        self.last_change = 0.0 # Changed-pixel fraction of the last check
+        self._reference = None
+        self._reference_time = 0.0
+        self._lock = threading.Lock()
+
+    def _thumbnail(self, image):
+        small = cv2.resize(image, self.size, interpolation=cv2.INTER_AREA)
+        gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        return cv2.GaussianBlur(gray, (3, 3), 0) # Sensor noise shouldn't count as motion
+
+    def should_infer(self, image):
+        thumbnail = self._thumbnail(image)
+        now = time.monotonic()
+        with self._lock:
+            self.checked += 1
+            if self._reference is not None and now - self._reference_time < self.max_staleness:
+                diff = cv2.absdiff(thumbnail, self._reference)
+                self.last_change = float(np.count_nonzero(diff > self.pixel_delta)) / diff.size
+                if self.last_change < self.threshold:
+                    self.skipped += 1
+                    return False
+            self._reference = thumbnail
+            self._reference_time = now
+            return True
+
+    def reset(self):
+        with self._lock:
+            self._reference = None
+
+    def stats(self):
+        return {
+            "checked": self.checked,
+            "skipped": self.skipped,
+            "skip_ratio": round(self.skipped / self.checked, 3) if self.checked else 0.0,
+            "last_change": round(self.last_change, 4),
+        }
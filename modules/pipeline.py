@@ -0,0 +1,194 @@
+import time
+from collections import namedtuple
+
+from . adaptive import AdaptiveCadence
+from . app_settings import Settings
+from . capture import CaptureWorker
+from . detectors import class_ids, present_classes
+from . inference import InferenceWorker
+from . motion import MotionGate
+from . scheduler import InferenceScheduler
+from . scoring import Presence, ScoringEngine
+from . tracker import BoxTracker
+
+# ONE SCORED INFERENCE RESULT, handed to the pipeline's on_result callback
+ScoredResult = namedtuple("ScoredResult", ["result", "presence", "update"])
+
+
+def motion_gate():
+    if not Settings.MOTION_GATE:
+        return None
+    return MotionGate(Settings.MOTION_THRESHOLD, Settings.MOTION_PIXEL_DELTA, Settings.MOTION_MAX_STALENESS)
+
+
+def box_tracker():
+    if not Settings.TRACKING:
+        return None
+    return BoxTracker(Settings.TRACK_IOU, Settings.TRACK_MAX_AGE)
+
+
+def tracked_presence(tracker, result, names, names_2):
+    # Person/phone presence from the tracked boxes, so a single missed detection doesn't flip the state
+    if tracker is None:
+        return presence_from(result.detections, names, names_2)
+    pred, pred2 = result.detections
+    return presence_from((tracker.update(pred, result.timestamp), pred2), names, names_2)
+
+
+def presence_from(detections, names, names_2):
+    pred, pred2 = detections
+    person, phone = present_classes(pred, class_ids(names, ("person", "cell phone")))
+    drowsy, = present_classes(pred2, class_ids(names_2, ("drowsy",)))
+    return Presence(bool(person), bool(phone), bool(drowsy))
+
+
+class DetectionPipeline():
+    # CAPTURE -> DETECT -> SCORE, WITHOUT ANY GUI
+    # on_result runs on an inference worker thread; the GUI forwards it through a Qt signal,
+    # the headless CLI writes it straight to stdout
+    def __init__(self, engine, state=None, source=None, on_result=None, frame_skip=None, workers=None):
+        self.engine = engine
+        self.state = state or ScoringEngine()
+        self.on_result = on_result
+        self.names = engine.detectors[0].names
+        self.names_2 = engine.detectors[1].names
+        self.enabled = Presence(True, True, True) # Which detections count towards the score
+        self.started_at = None
+        self.motion = motion_gate() # Reuses the last detections while the scene is static
+        self.last_detections = None
+        self.tracker = box_tracker() # Person/phone boxes extrapolated between detector runs
+
+        frame_skip = Settings.FRAME_SKIP if frame_skip is None else frame_skip
+        self.cadence = None
+        if Settings.ADAPTIVE_CADENCE:
+            self.cadence = AdaptiveCadence(engine, Settings.CPU_BUDGET, Settings.TARGET_LATENCY, frame_skip, Settings.MAX_FRAME_SKIP, Settings.ADAPTIVE_RESOLUTION)
+
+        source = Settings.CAMERA_INDEX if source is None else source
+        self.capture = CaptureWorker(source, Settings.FRAME_WIDTH, Settings.FRAME_HEIGHT, Settings.CAPTURE_BUFFER_SIZE)
+        self.inference = InferenceWorker(
+            self.capture.buffer, self.detect, self._on_result,
+            Settings.INFERENCE_WORKERS if workers is None else workers,
+            frame_skip, self.cadence,
+        )
+        self.frames_scored = 0
+
+    def start(self):
+        self.started_at = time.monotonic()
+        self.capture.start()
+        self.inference.start()
+
+    def stop(self):
+        self.inference.stop()
+        self.capture.stop()
+
+    def finished(self):
+        return self.capture.finished.is_set()
+
+    def detect(self, image):
+        # Returns (detections, whether the engine ran), static frames reuse the previous detections
+        if self.motion is not None and not self.motion.should_infer(image) and self.last_detections is not None:
+            return self.last_detections, False
+        detections = tuple(self.engine.run(image)) # Person/phone and drowsiness predictions
+        self.last_detections = detections
+        return detections, True
+
+    def _on_result(self, result):
+        presence = tracked_presence(self.tracker, result, self.names, self.names_2)
+        update = self.state.observe(result.timestamp, presence, self.enabled)
+        self.frames_scored += 1
+        if self.on_result:
+            self.on_result(ScoredResult(result, presence, update))
+
+    def tracked_boxes(self, frame):
+        # Person/phone boxes for any captured frame, None without a tracker
+        return self.tracker.boxes_at(frame.timestamp) if self.tracker else None
+
+    def stats(self):
+        elapsed = time.monotonic() - self.started_at if self.started_at else 0.0
+        return {
+            "elapsed_s": round(elapsed, 2),
+            "frames_scored": self.frames_scored,
+            "scored_fps": round(self.frames_scored / elapsed, 2) if elapsed else 0.0,
+            "capture": self.capture.stats(),
+            "inference": self.inference.stats(),
+            "timings_ms": self.engine.timing_report(),
+            "roi": self.engine.roi_report() if self.engine.roi_detector else None,
+            "cadence": self.cadence.state() if self.cadence else None,
+            "motion": self.motion.stats() if self.motion else None,
+            "tracker": self.tracker.stats() if self.tracker else None,
+        }
+
+
+class CameraSession():
+    # ONE CAMERA'S CAPTURE AND SESSION STATE INSIDE A MultiCameraPipeline
+    def __init__(self, camera_id, source, state=None):
+        self.camera_id = camera_id
+        self.capture = CaptureWorker(source, Settings.FRAME_WIDTH, Settings.FRAME_HEIGHT, Settings.CAPTURE_BUFFER_SIZE)
+        self.state = state or ScoringEngine()
+        self.enabled = Presence(True, True, True)
+        self.motion = motion_gate()
+        self.tracker = box_tracker()
+        self.frames_scored = 0
+
+
+class MultiCameraPipeline():
+    # N CAMERAS, EACH WITH ITS OWN SESSION STATE, SHARING ONE BATCHED INFERENCE SCHEDULER
+    # on_result(camera_id, ScoredResult) runs on the scheduler thread
+    def __init__(self, engine, sources, on_result=None, max_batch=None, frame_skip=None):
+        self.engine = engine
+        self.on_result = on_result
+        self.names = engine.detectors[0].names
+        self.names_2 = engine.detectors[1].names
+        self.started_at = None
+        self.scheduler = InferenceScheduler(
+            engine,
+            Settings.MAX_BATCH if max_batch is None else max_batch,
+            Settings.FRAME_SKIP if frame_skip is None else frame_skip,
+        )
+        self.cameras = {}
+        for i, source in enumerate(sources):
+            camera = CameraSession(f"cam{i}", source)
+            self.cameras[camera.camera_id] = camera
+            self.scheduler.add_source(camera.camera_id, camera.capture.buffer, self._on_result, camera.motion)
+
+    def start(self):
+        self.started_at = time.monotonic()
+        for camera in self.cameras.values():
+            camera.capture.start()
+        self.scheduler.start()
+
+    def stop(self):
+        self.scheduler.stop()
+        for camera in self.cameras.values():
+            camera.capture.stop()
+
+    def finished(self):
+        # True once every source is a video file that has run out
+        return all(camera.capture.finished.is_set() for camera in self.cameras.values())
+
+    def _on_result(self, camera_id, result):
+        camera = self.cameras[camera_id]
+        presence = tracked_presence(camera.tracker, result, self.names, self.names_2)
+        update = camera.state.observe(result.timestamp, presence, camera.enabled)
+        camera.frames_scored += 1
+        if self.on_result:
+            self.on_result(camera_id, ScoredResult(result, presence, update))
+
+    def stats(self):
+        elapsed = time.monotonic() - self.started_at if self.started_at else 0.0
+        scheduler = self.scheduler.stats()
+        return {
+            "elapsed_s": round(elapsed, 2),
+            "batches": scheduler["batches"],
+            "timings_ms": scheduler["timings_ms"],
+            "cameras": {
+                camera_id: {
+                    "frames_scored": camera.frames_scored,
+                    "capture": camera.capture.stats(),
+                    "inference": scheduler["sources"].get(camera_id, {}),
+                    "motion": camera.motion.stats() if camera.motion else None,
+                    "tracker": camera.tracker.stats() if camera.tracker else None,
+                }
+                for camera_id, camera in self.cameras.items()
+            },
+        }
@@ -0,0 +1,57 @@
+import threading
+import time
+from contextlib import contextmanager
+
+# STARTUP PROFILE
+# Phases can be recorded from any thread, offsets are relative to the moment the profile was created
+class StartupProfile():
+    def __init__(self):
+        self.origin = time.perf_counter()
+        self.phases = [] # (name, start offset, duration) in seconds
+        self._lock = threading.Lock()
+
+    def record(self, name, start, end):
+        with self._lock:
+            self.phases.append((name, start - self.origin, end - start))
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, start, time.perf_counter())
+
+    def mark(self, name):
+        # Zero-length milestone, e.g. the moment the window is shown
+        now = time.perf_counter()
+        self.record(name, now, now)
+
+    def report(self, importtime=False):
+        with self._lock:
+            phases = sorted(self.phases, key=lambda p: p[1])
+        if importtime:
+            return self._importtime_report(phases)
+        lines = ["Startup breakdown:"]
+        for name, offset, duration in phases:
+            lines.append(f"  {offset * 1000:8.1f} ms  +{duration * 1000:8.1f} ms  {name}")
+        return "\n".join(lines)
+
+    def _importtime_report(self, phases):
+        # Same columns as `python -X importtime`: self and cumulative microseconds, nested phases indented
+        lines = ["startup time: self [us] | cumulative | phase"]
+        stack = [] # (end offset, index into rows) of enclosing phases
+        rows = []
+        for name, offset, duration in phases:
+            while stack and offset >= stack[-1][0]:
+                stack.pop()
+            rows.append([name, duration, duration, len(stack)])
+            if stack:
+                rows[stack[-1][1]][1] -= duration # Nested time is not the parent's own time
+            stack.append((offset + duration, len(rows) - 1))
+        for name, own, cumulative, depth in rows:
+            lines.append(f"startup time: {int(max(own, 0) * 1e6):>9} | {int(cumulative * 1e6):>10} | {'  ' * depth}{name}")
+        return "\n".join(lines)
+
+
+startup_profile = StartupProfile()
@@ -0,0 +1,156 @@
+import hashlib
+import json
+import os
+import sys
+import time
+
+from . backends import frame_paths, load_frames, match_boxes
+from . detectors import preprocess
+from . lazy import lazy_import
+
+np = lazy_import("numpy")
+
+# INT8 POST-TRAINING QUANTIZATION OF THE EXPORTED ONNX MODELS
+PRECISIONS = ("fp32", "int8-dynamic", "int8-static")
+REPORT_LABELS = ("person", "cell phone", "drowsy")
+CALIBRATION_FRAMES = 200
+
+
+def calibration_fingerprint(folder, limit=CALIBRATION_FRAMES):
+    # Names, sizes and mtimes of the frames a static quantization reads, cheap enough to check on every start
+    sha = hashlib.sha256()
+    for path in frame_paths(folder, limit):
+        stat = os.stat(path)
+        sha.update(f"{os.path.basename(path)}:{stat.st_size}:{stat.st_mtime_ns}\n".encode())
+    return sha.hexdigest()
+
+
+def quantized_path(fp32_path, precision, calibration_dir=None):
+    # Static models are also keyed by their calibration set, recording new frames re-quantizes
+    root, ext = os.path.splitext(fp32_path)
+    if precision == "int8-static":
+        return f"{root}-{precision}-{calibration_fingerprint(calibration_dir)[:12]}{ext}"
+    return f"{root}-{precision}{ext}"
+
+
+def calibration_reader(folder, size=640, stride=32, limit=CALIBRATION_FRAMES):
+    from onnxruntime.quantization import CalibrationDataReader
+
+    class FrameCalibrationReader(CalibrationDataReader):
+        # FEEDS RECORDED WEBCAM FRAMES THROUGH THE SAME LETTERBOX AS LIVE INFERENCE
+        def __init__(self):
+            self.frames = iter(load_frames(folder, limit))
+
+        def get_next(self):
+            item = next(self.frames, None)
+            if item is None:
+                return None
+            tensor, _ = preprocess(item[1], size, stride)
+            return {"images": tensor.numpy()}
+
+    return FrameCalibrationReader()
+
+
+def quantize_model(fp32_path, precision, calibration_dir=None):
+    # Writes the quantized model next to the FP32 export and returns its path, cached like the export itself
+    from onnxruntime.quantization import QuantFormat, QuantType, quantize_dynamic, quantize_static
+
+    if precision == "int8-static" and (not calibration_dir or not frame_paths(calibration_dir, 1)):
+        raise ValueError(f"static quantization needs recorded frames in {calibration_dir}")
+    path = quantized_path(fp32_path, precision, calibration_dir)
+    if os.path.exists(path):
+        return path
+
+    tmp_path = path + ".tmp"
+    if precision == "int8-dynamic":
+        quantize_dynamic(fp32_path, tmp_path, weight_type=QuantType.QUInt8)
+    elif precision == "int8-static":
+        quantize_static(
+            fp32_path, tmp_path, calibration_reader(calibration_dir),
+            quant_format=QuantFormat.QDQ, per_channel=True,
+            activation_type=QuantType.QUInt8, weight_type=QuantType.QInt8,
+        )
+    else:
+        raise ValueError(f"unknown precision {precision}")
+    os.replace(tmp_path, path)
+    return path
+
+
+# REPORTS
+def label_ids(names, labels):
+    items = names.items() if isinstance(names, dict) else enumerate(names)
+    return {label: int(i) for i, label in items if label in labels}
+
+
+def accuracy_report(reference, candidate, frames, labels=REPORT_LABELS, iou_thres=0.5):
+    # Precision/recall of the candidate engine per label, taking the FP32 reference as ground truth
+    counts = {}
+    for path, image in frames:
+        for ref_pred, cand_pred, detector in zip(reference.run(image), candidate.run(image), reference.detectors):
+            for label, cls in label_ids(detector.names, labels).items():
+                ref = ref_pred[ref_pred[:, 5] == cls]
+                cand = cand_pred[cand_pred[:, 5] == cls]
+                matched, _, _ = match_boxes(ref, cand, iou_thres)
+                c = counts.setdefault(label, {"tp": 0, "fp": 0, "fn": 0})
+                c["tp"] += matched
+                c["fp"] += len(cand) - matched
+                c["fn"] += len(ref) - matched
+
+    return {
+        label: {
+            "precision": round(c["tp"] / max(c["tp"] + c["fp"], 1), 4),
+            "recall": round(c["tp"] / max(c["tp"] + c["fn"], 1), 4),
+            **c,
+        }
+        for label, c in counts.items()
+    }
+
+
+def latency_report(engine, frames, warmup=3):
+    for _, image in frames[:warmup]:
+        engine.run(image)
+    samples = []
+    for _, image in frames:
+        start = time.perf_counter()
+        engine.run(image)
+        samples.append((time.perf_counter() - start) * 1000)
+    samples = np.array(samples)
+    return {
+        "mean_ms": round(float(samples.mean()), 2),
+        "p50_ms": round(float(np.percentile(samples, 50)), 2),
+        "p95_ms": round(float(np.percentile(samples, 95)), 2),
+        "frames": len(samples),
+    }
+
+
+if __name__ == "__main__":
+    # python -m modules.quantize <frames folder> [precision]
+    # Prints accuracy and latency of a quantized mode against FP32 so each machine can pick one
+    from modules.app_settings import Settings
+    from modules.model_registry import ModelRegistry
+    from modules.backends import load_backend
+    from modules.detectors import Detector, DetectorEngine, letterbox_shape
+
+    folder = sys.argv[1]
+    precision = sys.argv[2] if len(sys.argv) > 2 else "int8-static"
+    frames = load_frames(folder)
+
+    registry = ModelRegistry(Settings.MODEL_CACHE_DIR, Settings.MODEL_VERSION)
+    model = registry.load("yolov5s")
+    model.classes = [0, 67]
+    model_2 = registry.load("drowsiness")
+    sources = [("objects", model, registry.sha256("yolov5s")), ("drowsiness", model_2, registry.sha256("drowsiness"))]
+    shape = letterbox_shape((Settings.FRAME_HEIGHT, Settings.FRAME_WIDTH))
+
+    def build(prec):
+        return DetectorEngine([
+            Detector(name, m, load_backend("onnx", name, m.model, fingerprint, shape, Settings.MODEL_CACHE_DIR, Settings.INFERENCE_THREADS, prec, folder))
+            for name, m, fingerprint in sources
+        ])
+
+    reference, candidate = build("fp32"), build(precision)
+    print(json.dumps({
+        "precision": precision,
+        "accuracy": accuracy_report(reference, candidate, frames),
+        "latency": {"fp32": latency_report(reference, frames), precision: latency_report(candidate, frames)},
+    }, indent=2))
@@ -0,0 +1,134 @@
+import threading
+import time
+
+from . inference import DetectionResult
+
+
+class SourceStats():
+    # PER-SOURCE THROUGHPUT AND CAPTURE-TO-RESULT LATENCY
+    def __init__(self):
+        self.served = 0
+        self.fps = 0.0
+        self.latency = 0.0 # Smoothed seconds from capture timestamp to detections ready
+        self._window_start = time.monotonic()
+        self._window_served = 0
+
+    def record(self, latency):
+        self.served += 1
+        self.latency = latency if self.served == 1 else self.latency * 0.9 + latency * 0.1
+        self._window_served += 1
+        now = time.monotonic()
+        if now - self._window_start >= 1.0:
+            self.fps = self._window_served / (now - self._window_start)
+            self._window_start = now
+            self._window_served = 0
+
+    def as_dict(self):
+        return {"served": self.served, "fps": round(self.fps, 1), "latency_ms": round(self.latency * 1000, 1)}
+
+
+class _Source():
+    # ONE FRAME SOURCE REGISTERED WITH THE SCHEDULER
+    def __init__(self, source_id, buffer, on_result, motion=None):
+        self.source_id = source_id
+        self.buffer = buffer
+        self.on_result = on_result
+        self.motion = motion # Optional MotionGate
+        self.last_index = -1 # Index of the last frame claimed for inference
+        self.stats = SourceStats()
+        self.last_detections = None
+
+    def needs_inference(self, frame):
+        # The gate sees every frame so its reference stays current, even while there is nothing to reuse yet
+        return self.motion is None or self.motion.should_infer(frame.image) or self.last_detections is None
+
+
+class InferenceScheduler():
+    # ONE INFERENCE THREAD SHARED BY MANY FRAME SOURCES
+    # Each pass batches the freshest new frame of up to `max_batch` sources into a single forward pass
+    # per model. Sources are visited round-robin starting after the last one served, so under load
+    # every camera gets a turn instead of the fastest one starving the rest.
+    def __init__(self, engine, max_batch=4, frame_skip=1):
+        self.engine = engine
+        self.max_batch = max(1, max_batch)
+        self.frame_skip = max(1, frame_skip)
+        self.batches = 0
+        self._sources = []
+        self._next = 0
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._running = threading.Event()
+        self._thread = None
+
+    def add_source(self, source_id, frame_buffer, on_result, motion_gate=None):
+        # on_result(source_id, DetectionResult) runs on the scheduler thread
+        # With a MotionGate, static frames reuse the source's last detections instead of joining the batch
+        frame_buffer.on_push = self._wake.set
+        with self._lock:
+            self._sources.append(_Source(source_id, frame_buffer, on_result, motion_gate))
+
+    def start(self):
+        if self._thread is None:
+            self._running.set()
+            self._thread = threading.Thread(target=self._run, name="InferenceScheduler", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._running.clear()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def stats(self):
+        with self._lock:
+            sources = {source.source_id: source.stats.as_dict() for source in self._sources}
+        return {"batches": self.batches, "sources": sources, "timings_ms": self.engine.timing_report()}
+
+    def _collect(self):
+        # Round-robin over sources with a fresh enough frame, at most max_batch of them
+        with self._lock:
+            count = len(self._sources)
+            picked = []
+            for step in range(count):
+                i = (self._next + step) % count
+                source = self._sources[i]
+                frame = source.buffer.latest(source.last_index + self.frame_skip - 1)
+                if frame is None:
+                    continue
+                source.last_index = frame.index
+                picked.append((source, frame))
+                if len(picked) == self.max_batch:
+                    self._next = (i + 1) % count
+                    break
+            else:
+                if picked:
+                    self._next = (self._sources.index(picked[-1][0]) + 1) % count
+        return picked
+
+    def _run(self):
+        while self._running.is_set():
+            self._wake.clear() # Cleared before collecting so a push during the pass is never missed
+            picked = self._collect()
+            if not picked:
+                self._wake.wait(0.1)
+                continue
+
+            # Static scenes reuse their previous detections, only changed frames are batched
+            infer, reuse = [], []
+            for source, frame in picked:
+                (infer if source.needs_inference(frame) else reuse).append((source, frame))
+
+            latency = 0.0
+            if infer:
+                start = time.perf_counter()
+                results = self.engine.run_batch([frame.image for _, frame in infer])
+                latency = time.perf_counter() - start
+                self.batches += 1
+                for (source, _), detections in zip(infer, results):
+                    source.last_detections = tuple(detections)
+
+            done = time.monotonic()
+            for source, frame in infer + reuse:
+                source.stats.record(done - frame.timestamp)
+                source.on_result(source.source_id, DetectionResult(frame.index, frame.timestamp, source.last_detections, latency))
@@ -0,0 +1,178 @@
+import threading
+from collections import namedtuple
+
+from . app_settings import Settings
+from . lazy import lazy_import
+
+np = lazy_import("numpy")
+
+# DETECTION FLAGS FOR ONE FRAME, AND WHAT SCORING IT CHANGED
+Presence = namedtuple("Presence", ["person", "phone", "drowsy"])
+ScoreEvent = namedtuple("ScoreEvent", ["timestamp", "kind", "reason", "value"]) # kind: started, ended (value: seconds), alert (value: seconds in)
+ScoreUpdate = namedtuple("ScoreUpdate", ["events", "productivity"])
+
+DISTRACTIONS = ("away", "phone", "drowsy")
+
+
+def distracted(presence, enabled=(True, True, True)):
+    # Active distractions for one frame, a disabled detection never counts
+    person_enabled, phone_enabled, drowsy_enabled = enabled
+    return (person_enabled and not presence.person, phone_enabled and presence.phone, drowsy_enabled and presence.drowsy)
+
+
+class ScoringRules():
+    # TIME-BASED SCORING RULES - every rate is per second, so results don't depend on the frame rate
+    # penalty and alert_after take one value for every distraction or a dict keyed by distraction
+    def __init__(self, penalty=10.0, recovery=5.0, alert_after=None, max_productivity=101.0, min_productivity=None, max_gap=2.0, initial=100.0):
+        self.penalty = penalty if isinstance(penalty, dict) else {k: penalty for k in DISTRACTIONS}
+        alert_after = {"away": 2.0, "phone": 2.0, "drowsy": 6.0} if alert_after is None else alert_after
+        self.alert_after = alert_after if isinstance(alert_after, dict) else {k: alert_after for k in DISTRACTIONS}
+        self.recovery = recovery
+        self.max_productivity = max_productivity
+        self.min_productivity = min_productivity
+        self.max_gap = max_gap # Longer gaps between observations (camera stall, paused video) count as this long
+        self.initial = initial
+
+    @classmethod
+    def from_settings(cls):
+        return cls(
+            Settings.PENALTY_PER_SECOND, Settings.RECOVERY_PER_SECOND, dict(Settings.ALERT_AFTER),
+            Settings.MAX_PRODUCTIVITY, Settings.MIN_PRODUCTIVITY, Settings.MAX_SCORE_GAP,
+        )
+
+    def clamp(self, productivity):
+        productivity = min(productivity, self.max_productivity)
+        if self.min_productivity is not None:
+            productivity = max(productivity, self.min_productivity)
+        return productivity
+
+
+class ScoringEngine():
+    # EVENT-DRIVEN PRODUCTIVITY SCORING FOR ONE CAMERA
+    # observe() consumes timestamped detections and returns the state changes they caused. Between two observations
+    # the previous distractions hold: productivity moves by recovery minus their penalties per second and their
+    # totals grow. Alerts fire every alert_after seconds of one continuous distraction while the session is started.
+    def __init__(self, rules=None):
+        self.rules = rules or ScoringRules.from_settings()
+        self.started = False
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        # Safe to call while detections are still coming in from the inference thread
+        with self._lock:
+            self.productivity = self.rules.initial
+            self.last_time = None
+            self.active = {k: None for k in DISTRACTIONS} # Start time of each ongoing distraction
+            self.totals = {k: 0.0 for k in DISTRACTIONS} # Seconds spent in each distraction
+            self.episodes = {k: 0 for k in DISTRACTIONS}
+            self.alerts = {k: 0 for k in DISTRACTIONS}
+            self._alert_level = {k: 0 for k in DISTRACTIONS} # Alert periods already reported for the ongoing distraction
+
+    def _advance(self, timestamp):
+        if self.last_time is None or timestamp <= self.last_time:
+            self.last_time = timestamp if self.last_time is None else self.last_time
+            return
+        dt = min(timestamp - self.last_time, self.rules.max_gap)
+        rate = self.rules.recovery
+        for k, start in self.active.items():
+            if start is not None:
+                rate -= self.rules.penalty[k]
+                self.totals[k] += dt
+        self.productivity = self.rules.clamp(self.productivity + rate * dt)
+        self.last_time = timestamp
+
+    def observe(self, timestamp, presence, enabled=(True, True, True)):
+        with self._lock:
+            self._advance(timestamp)
+            events = []
+            for k, on in zip(DISTRACTIONS, distracted(presence, enabled)):
+                start = self.active[k]
+                if on and start is None:
+                    self.active[k] = timestamp
+                    self._alert_level[k] = 0
+                    self.episodes[k] += 1
+                    events.append(ScoreEvent(timestamp, "started", k, 0.0))
+                elif on:
+                    level = int((timestamp - start) // self.rules.alert_after[k])
+                    if self.started and level > self._alert_level[k]:
+                        self._alert_level[k] = level
+                        self.alerts[k] += 1
+                        events.append(ScoreEvent(timestamp, "alert", k, timestamp - start))
+                elif start is not None:
+                    self.active[k] = None
+                    events.append(ScoreEvent(timestamp, "ended", k, timestamp - start))
+            return ScoreUpdate(events, self.productivity)
+
+    def advance(self, timestamp):
+        # Moves the clock without a detection (e.g. a GUI tick), returns the current productivity
+        with self._lock:
+            self._advance(timestamp)
+            return self.productivity
+
+    def critical_error(self):
+        # The distraction with the strictly longest total, or None on a tie
+        top = max(self.totals, key=self.totals.get)
+        if all(self.totals[top] > total for key, total in self.totals.items() if key != top):
+            return top
+        return None
+
+
+def score_timeline(timestamps, person, phone, drowsy, rules=None, enabled=(True, True, True)):
+    # Batch version of ScoringEngine.observe() over a whole recording (started from the first detection),
+    # vectorized with NumPy so hours of detections score in milliseconds. Returns the productivity after
+    # every detection plus the same totals, episodes, alerts and events the live engine would report.
+    # Timestamps must be in order.
+    rules = rules or ScoringRules.from_settings()
+    t = np.asarray(timestamps, dtype=np.float64)
+    n = len(t)
+    person, phone, drowsy = (np.asarray(flags, dtype=bool) for flags in (person, phone, drowsy))
+    flags = (~person & enabled[0], phone & enabled[1], drowsy & enabled[2])
+    dt = np.clip(np.diff(t, prepend=t[:1]), 0.0, rules.max_gap)
+    index = np.arange(n)
+    times = t.tolist()
+
+    rate = np.full(n, float(rules.recovery))
+    totals, episodes, alerts, events = {}, {}, {}, []
+    for k, on in zip(DISTRACTIONS, flags):
+        held = np.concatenate([[False], on[:-1]]) # Distraction in force during the interval ending at each detection
+        rate -= held * rules.penalty[k]
+        totals[k] = float((dt * held).sum())
+
+        # Episodes start and end where the flag flips, alerts where the seconds-in // alert_after step grows
+        starts = on & ~held
+        ends = ~on & held
+        start_time = t[np.maximum.accumulate(np.where(starts, index, 0))]
+        since = t - start_time
+        level = np.where(on, since // rules.alert_after[k], 0)
+        fired = on & held & (level > np.concatenate([[0], level[:-1]]))
+
+        episodes[k] = int(starts.sum())
+        alerts[k] = int(fired.sum())
+        events += [ScoreEvent(times[i], "started", k, 0.0) for i in np.flatnonzero(starts)]
+        events += [ScoreEvent(times[i], "ended", k, times[i] - float(start_time[i - 1])) for i in np.flatnonzero(ends)]
+        events += [ScoreEvent(times[i], "alert", k, float(since[i])) for i in np.flatnonzero(fired)]
+
+    # Productivity is a running sum capped at the top: subtracting the running overshoot is the same as
+    # clamping after every step. A floor needs the step by step clamp.
+    delta = rate * dt
+    if rules.min_productivity is None:
+        running = rules.initial + np.cumsum(delta)
+        productivity = running - np.maximum.accumulate(np.maximum(running - rules.max_productivity, 0.0))
+    else:
+        productivity = np.empty(n)
+        value = rules.initial
+        for i, step in enumerate(delta.tolist()):
+            value = rules.clamp(value + step)
+            productivity[i] = value
+
+    events.sort(key=lambda event: event.timestamp)
+    top = max(totals, key=totals.get)
+    return {
+        "productivity": productivity,
+        "totals": totals,
+        "episodes": episodes,
+        "alerts": alerts,
+        "events": events,
+        "critical_error": top if all(totals[top] > total for key, total in totals.items() if key != top) else None,
+    }
@@ -0,0 +1,111 @@
+import os
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id TEXT PRIMARY KEY,
+    started_at REAL NOT NULL,
+    ended_at REAL,
+    duration_s REAL,
+    productivity REAL,
+    away_s REAL, -- seconds in each distraction
+    phone_s REAL,
+    drowsy_s REAL,
+    critical_error TEXT
+);
+CREATE TABLE IF NOT EXISTS detections (
+    session_id TEXT NOT NULL,
+    frame_index INTEGER NOT NULL,
+    timestamp REAL NOT NULL,
+    person INTEGER NOT NULL,
+    phone INTEGER NOT NULL,
+    drowsy INTEGER NOT NULL,
+    productivity REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS detections_session ON detections (session_id, timestamp);
+"""
+
+
+class SessionStore():
+    # SQLITE SESSION HISTORY WRITTEN BY A BACKGROUND THREAD
+    # Callers only enqueue; the writer batches rows into one transaction per `batch_size` events
+    # or every `flush_interval` seconds, whichever comes first
+    def __init__(self, path, batch_size=200, flush_interval=1.0):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.written = 0
+        self._queue = queue.Queue()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="SessionStore", daemon=True)
+            self._thread.start()
+
+    def close(self):
+        if self._thread is not None:
+            self._queue.put(None) # Writer drains everything queued before this, then exits
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def stats(self):
+        return {"written": self.written, "pending": self._queue.qsize()}
+
+    # PRODUCER API - never touches the database, safe to call from the frame loop
+    def start_session(self, started_at=None):
+        session_id = uuid.uuid4().hex
+        self._queue.put(("session", (session_id, started_at or time.time())))
+        return session_id
+
+    def log_detection(self, session_id, frame_index, timestamp, person, phone, drowsy, productivity):
+        self._queue.put(("detection", (session_id, frame_index, timestamp, int(person), int(phone), int(drowsy), productivity)))
+
+    def end_session(self, session_id, duration, productivity, away_s, phone_s, drowsy_s, critical_error=None):
+        self._queue.put(("summary", (time.time(), duration, productivity, away_s, phone_s, drowsy_s, critical_error, session_id)))
+
+    # WRITER
+    def _connect(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        db = sqlite3.connect(self.path)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        db.executescript(SCHEMA)
+        return db
+
+    def _write(self, db, batch):
+        sessions = [row for kind, row in batch if kind == "session"]
+        detections = [row for kind, row in batch if kind == "detection"]
+        summaries = [row for kind, row in batch if kind == "summary"]
+        with db: # One transaction per batch
+            db.executemany("INSERT OR IGNORE INTO sessions (id, started_at) VALUES (?, ?)", sessions)
+            db.executemany("INSERT INTO detections VALUES (?, ?, ?, ?, ?, ?, ?)", detections)
+            db.executemany(
+                "UPDATE sessions SET ended_at = ?, duration_s = ?, productivity = ?, away_s = ?, "
+                "phone_s = ?, drowsy_s = ?, critical_error = ? WHERE id = ?", summaries)
+        self.written += len(batch)
+
+    def _run(self):
+        db = self._connect()
+        batch = []
+        deadline = time.monotonic() + self.flush_interval
+        running = True
+        while running:
+            try:
+                item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                if item is None:
+                    running = False
+                else:
+                    batch.append(item)
+            except queue.Empty:
+                pass
+            if batch and (len(batch) >= self.batch_size or time.monotonic() >= deadline or not running):
+                self._write(db, batch)
+                batch = []
+            if time.monotonic() >= deadline:
+                deadline = time.monotonic() + self.flush_interval
+        db.close()
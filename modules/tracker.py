@@ -0,0 +1,130 @@
+import threading
+
+from . lazy import lazy_import
+
+np = lazy_import("numpy")
+
+
+def iou_matrix(a, b):
+    # Pairwise IoU between (n, 4) and (m, 4) x1, y1, x2, y2 boxes
+    x1 = np.maximum(a[:, None, 0], b[None, :, 0])
+    y1 = np.maximum(a[:, None, 1], b[None, :, 1])
+    x2 = np.minimum(a[:, None, 2], b[None, :, 2])
+    y2 = np.minimum(a[:, None, 3], b[None, :, 3])
+    inter = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+    area_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+    area_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+    return inter / np.maximum(area_a[:, None] + area_b[None, :] - inter, 1e-9)
+
+
+class Track():
+    # CONSTANT-VELOCITY KALMAN FILTER OVER ONE BOX
+    # State is cx, cy, w, h and their velocities per second, so skipped frames of any length extrapolate correctly
+    def __init__(self, track_id, det, timestamp):
+        self.track_id = track_id
+        self.cls = int(det[5])
+        self.conf = float(det[4])
+        self.hits = 1
+        self.last_update = timestamp
+        self.x = np.zeros(8)
+        self.x[:4] = self._measurement(det)
+        self.P = np.diag([10.0, 10.0, 10.0, 10.0, 1e3, 1e3, 1e3, 1e3]) # Velocity unknown at birth
+        self.timestamp = timestamp
+
+    @staticmethod
+    def _measurement(det):
+        x1, y1, x2, y2 = (float(v) for v in det[:4])
+        return np.array([(x1 + x2) / 2, (y1 + y2) / 2, x2 - x1, y2 - y1])
+
+    @staticmethod
+    def _transition(dt):
+        F = np.eye(8)
+        F[:4, 4:] = np.eye(4) * dt
+        return F
+
+    def predict(self, timestamp):
+        dt = max(0.0, timestamp - self.timestamp)
+        F = self._transition(dt)
+        Q = np.diag([1.0, 1.0, 1.0, 1.0, 50.0, 50.0, 25.0, 25.0]) * max(dt, 1e-3)
+        self.x = F @ self.x
+        self.x[2:4] = np.maximum(self.x[2:4], 1.0)
+        self.P = F @ self.P @ F.T + Q
+        self.timestamp = timestamp
+
+    def correct(self, det, timestamp):
+        H = np.eye(4, 8)
+        R = np.eye(4) * 10.0
+        y = self._measurement(det) - H @ self.x
+        S = H @ self.P @ H.T + R
+        K = self.P @ H.T @ np.linalg.inv(S)
+        self.x = self.x + K @ y
+        self.P = (np.eye(8) - K @ H) @ self.P
+        self.conf = float(det[4])
+        self.hits += 1
+        self.last_update = timestamp
+
+    def box_at(self, timestamp):
+        # Extrapolated x1, y1, x2, y2 without touching the filter state
+        cx, cy, w, h = self.x[:4] + self.x[4:] * max(0.0, timestamp - self.timestamp)
+        w, h = max(w, 1.0), max(h, 1.0)
+        return cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2
+
+
+class BoxTracker():
+    # SORT-STYLE TRACKER THAT KEEPS DETECTOR BOXES ALIVE BETWEEN DETECTOR RUNS
+    # update() runs on every detector result, boxes_at() extrapolates tracks to any captured frame in between.
+    # Tracks unmatched for more than max_age seconds are dropped, so one missed detection doesn't flip a state.
+    def __init__(self, iou_threshold=0.3, max_age=1.0, min_hits=1):
+        self.iou_threshold = iou_threshold
+        self.max_age = max_age
+        self.min_hits = min_hits
+        self.tracks = []
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+    def update(self, pred, timestamp):
+        # pred is an (n, 6) x1, y1, x2, y2, conf, cls prediction, returns the tracked boxes in the same layout
+        dets = np.asarray(pred, dtype=np.float64).reshape(-1, 6)
+        with self._lock:
+            for track in self.tracks:
+                track.predict(timestamp)
+
+            # Greedy association by IoU, only between boxes of the same class
+            matched_tracks, matched_dets = set(), set()
+            if self.tracks and len(dets):
+                boxes = np.array([track.x[:4] for track in self.tracks])
+                boxes = np.concatenate([boxes[:, :2] - boxes[:, 2:] / 2, boxes[:, :2] + boxes[:, 2:] / 2], 1)
+                iou = iou_matrix(boxes, dets[:, :4])
+                iou[np.array([t.cls for t in self.tracks])[:, None] != dets[None, :, 5].astype(int)] = 0
+                for flat in np.argsort(-iou, axis=None):
+                    t, d = divmod(int(flat), len(dets))
+                    if iou[t, d] < self.iou_threshold:
+                        break
+                    if t in matched_tracks or d in matched_dets:
+                        continue
+                    self.tracks[t].correct(dets[d], timestamp)
+                    matched_tracks.add(t)
+                    matched_dets.add(d)
+
+            for d, det in enumerate(dets):
+                if d not in matched_dets:
+                    self.tracks.append(Track(self._next_id, det, timestamp))
+                    self._next_id += 1
+            self.tracks = [track for track in self.tracks if timestamp - track.last_update <= self.max_age]
+            return self._boxes(timestamp)
+
+    def boxes_at(self, timestamp):
+        with self._lock:
+            return self._boxes(timestamp)
+
+    def _boxes(self, timestamp):
+        rows = [(*track.box_at(timestamp), track.conf, track.cls) for track in self.tracks if track.hits >= self.min_hits]
+        return np.array(rows, dtype=np.float32).reshape(-1, 6)
+
+    def clear(self):
+        with self._lock:
+            self.tracks = []
+
+    def stats(self):
+        with self._lock:
+            return {"tracks": len(self.tracks), "created": self._next_id}
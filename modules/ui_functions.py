@@ -1,11 +1,17 @@
-# MAIN FILE
-from main import *
+# QT AND APP SETTINGS
+# Not `from main import *`, that would run main.py a second time
+from PySide6.QtCore import *
+from PySide6.QtGui import *
+from PySide6.QtWidgets import *
+
+from . app_settings import Settings
+from widgets import CustomGrip
 
 # GLOBALS
 GLOBAL_STATE = False
 GLOBAL_TITLE_BAR = True
 
-class UIFunctions(MainWindow):
+class UIFunctions(QMainWindow):
     # MAXIMIZE/RESTORE
     def maximize_restore(self):
         global GLOBAL_STATE
@@ -0,0 +1,52 @@
+import time
+
+from PySide6.QtCore import QTimer, Qt
+
+
+class MeasuredTimer():
+    # ONE QTIMER PER JOB, WITH ITS OWN TICK COUNT AND CALLBACK COST
+    # Keeps the stopwatch, frame pump and graph refresh apart so each runs at its own rate and can be measured
+    def __init__(self, name, interval, callback, timer_type=Qt.CoarseTimer, single_shot=False, parent=None):
+        self.name = name
+        self.callback = callback
+        self.timer = QTimer(parent)
+        self.timer.setInterval(interval)
+        self.timer.setTimerType(timer_type)
+        self.timer.setSingleShot(single_shot)
+        self.timer.timeout.connect(self._fire)
+        self.ticks = 0
+        self.busy = 0.0 # Seconds spent inside the callback
+        self.max_ms = 0.0
+        self.started_at = None
+
+    def start(self, interval=None):
+        if self.started_at is None:
+            self.started_at = time.monotonic()
+        if interval is None:
+            self.timer.start()
+        else:
+            self.timer.start(max(0, int(interval)))
+
+    def stop(self):
+        self.timer.stop()
+
+    def is_active(self):
+        return self.timer.isActive()
+
+    def _fire(self):
+        start = time.perf_counter()
+        self.callback()
+        elapsed = time.perf_counter() - start
+        self.ticks += 1
+        self.busy += elapsed
+        self.max_ms = max(self.max_ms, elapsed * 1000)
+
+    def stats(self):
+        running = time.monotonic() - self.started_at if self.started_at else 0.0
+        return {
+            "ticks": self.ticks,
+            "rate_hz": round(self.ticks / running, 2) if running else 0.0,
+            "mean_ms": round(self.busy * 1000 / self.ticks, 3) if self.ticks else 0.0,
+            "max_ms": round(self.max_ms, 3),
+            "busy_pct": round(100 * self.busy / running, 2) if running else 0.0,
+        }
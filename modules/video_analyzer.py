@@ -0,0 +1,150 @@
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from . app_settings import Settings
+from . lazy import lazy_import
+from . model_loader import ModelLoader
+from . inference import DetectionResult
+from . pipeline import box_tracker, tracked_presence
+from . scoring import score_timeline
+
+cv2 = lazy_import("cv2")
+torch = lazy_import("torch")
+
+# OFFLINE VIDEO ANALYSIS
+# The video is cut into time chunks, each analyzed in its own process with its own copy of both detectors.
+# Per-frame detections are merged back in frame order and scored in one vectorized pass with the same
+# time-based rules the live ScoringEngine uses, so the timeline and totals match the live app.
+# stdout carries only the JSON report, diagnostics from the parent and the workers go to stderr.
+
+_engine = None # Per worker process
+
+
+def prepare_models():
+    # Downloads, verifies, exports and quantizes everything once in the parent, so workers only read the cache
+    # instead of racing on the same temp files and export paths
+    ModelLoader(lambda *args: None, None, None).load(warmup=False)
+
+
+def _init_worker(threads):
+    global _engine
+    torch.set_num_threads(threads) # One intra-op pool per process, otherwise workers fight over cores
+    _engine = ModelLoader(lambda *args: None, None, None, threads=threads).load().engine
+
+
+def probe(path):
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        raise ValueError(f"cannot open {path}")
+    frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    cap.release()
+    return frames, fps
+
+
+def split_chunks(frames, chunks):
+    if frames <= 0:
+        return []
+    size = -(-frames // chunks)
+    return [(start, min(start + size, frames)) for start in range(0, frames, size)]
+
+
+def analyze_chunk(path, start, end, frame_skip, fps):
+    # Returns [(frame index, person, phone, drowsy)] for every frame index % frame_skip == 0 in [start, end)
+    # Presence goes through the same BoxTracker smoothing as the live app, clocked by video time. Each chunk
+    # starts with an empty tracker, like the live app does when the camera opens.
+    names, names_2 = _engine.detectors[0].names, _engine.detectors[1].names
+    tracker = box_tracker()
+    cap = cv2.VideoCapture(path)
+    cap.set(cv2.CAP_PROP_POS_FRAMES, start)
+    rows = []
+    for index in range(start, end):
+        if index % frame_skip:
+            if not cap.grab(): # Advance without converting the skipped frame
+                break
+            continue
+        ret, image = cap.read()
+        if not ret:
+            break
+        result = DetectionResult(index, index / fps, _engine.run(image), 0.0)
+        rows.append((index, *tracked_presence(tracker, result, names, names_2)))
+    cap.release()
+    return rows
+
+
+def score(rows, fps):
+    # Scores merged detections in frame order, video time stands in for the capture clock
+    index, person, phone, drowsy = zip(*rows) if rows else ((), (), (), ())
+    times = [i / fps for i in index]
+    scored = score_timeline(times, person, phone, drowsy)
+    productivity = scored["productivity"].tolist()
+    events = scored["events"]
+    return {
+        "timeline": [(round(t, 3), p) for t, p in zip(times, productivity)],
+        "episodes": [{"time": round(e.timestamp, 3), "reason": e.reason, "seconds": round(e.value, 3)} for e in events if e.kind == "ended"],
+        "alerts": [{"time": round(e.timestamp, 3), "reason": e.reason} for e in events if e.kind == "alert"],
+        **{f"{reason}_seconds": round(total, 3) for reason, total in scored["totals"].items()},
+        "productivity": productivity[-1] if productivity else None,
+        "critical_error": scored["critical_error"],
+    }
+
+
+def analyze_video(path, workers=None, frame_skip=None, chunks=None):
+    workers = workers or os.cpu_count() or 1
+    frame_skip = frame_skip or Settings.FRAME_SKIP
+    frames, fps = probe(path)
+    ranges = split_chunks(frames, chunks or workers * 4) # Extra chunks even out slow segments
+    if not ranges:
+        # No frame count in the container (some streams and webm files), read it sequentially until it ends
+        print(f"{path}: unknown frame count, analyzing in one sequential pass", file=sys.stderr)
+        ranges = [(0, sys.maxsize)]
+    threads = max(1, (os.cpu_count() or 1) // workers)
+
+    prepare_models()
+    start = time.perf_counter()
+    # Spawned workers, the parent has torch and its thread pools loaded by now and those don't survive a fork
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(workers, mp_context=context, initializer=_init_worker, initargs=(threads,)) as pool:
+        futures = [pool.submit(analyze_chunk, path, a, b, frame_skip, fps) for a, b in ranges]
+        rows = [row for future in futures for row in future.result()] # Chunk order is frame order
+    elapsed = time.perf_counter() - start
+
+    report = score(rows, fps)
+    report.update({
+        "video": path,
+        "frames": frames,
+        "fps": fps,
+        "frames_analyzed": len(rows),
+        "workers": workers,
+        "chunks": len(ranges),
+        "elapsed_s": round(elapsed, 2),
+        "analyzed_fps": round(len(rows) / elapsed, 2) if elapsed else 0.0,
+    })
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m modules.video_analyzer", description="Score a recorded study session.")
+    parser.add_argument("video")
+    parser.add_argument("--workers", type=int, default=0, help="processes (default: one per core)")
+    parser.add_argument("--chunks", type=int, default=0, help="time chunks (default: 4 per worker)")
+    parser.add_argument("--frame-skip", type=int, default=Settings.FRAME_SKIP)
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    args = parser.parse_args(argv)
+
+    report = analyze_video(args.video, args.workers or None, args.frame_skip, args.chunks or None)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text)
+    else:
+        sys.stdout.write(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+import os
+from collections import namedtuple
+
+import pytest
+
+torch = pytest.importorskip("torch")
+pytest.importorskip("torchvision")
+
+from modules.app_settings import Settings
+from modules.backends import frame_paths, load_frames, match_boxes, parity_engines, parity_passed, parity_report
+from modules.model_registry import ModelRegistry
+
+FakeDetector = namedtuple("FakeDetector", ["name"])
+
+
+class FakeEngine():
+    # Returns canned predictions per frame path, in place of a DetectorEngine
+    def __init__(self, predictions, names=("objects",)):
+        self.predictions = predictions
+        self.detectors = [FakeDetector(name) for name in names]
+
+    def run(self, image):
+        return self.predictions[image]
+
+
+def boxes(*rows):
+    return torch.tensor(rows, dtype=torch.float32).reshape(-1, 6)
+
+
+def test_match_boxes_same_class_only():
+    reference = boxes([0, 0, 100, 100, 0.9, 0], [200, 200, 300, 300, 0.8, 67])
+    candidate = boxes([2, 0, 100, 102, 0.85, 0], [200, 200, 300, 300, 0.8, 0])
+    matched, mean_iou, conf_delta = match_boxes(reference, candidate)
+    assert matched == 1
+    assert mean_iou == pytest.approx(float(100 * 98 / (100 * 100 + 98 * 102 - 100 * 98)), abs=1e-4)
+    assert conf_delta == pytest.approx(0.05, abs=1e-6)
+
+
+def test_match_boxes_one_to_one():
+    reference = boxes([0, 0, 100, 100, 0.9, 0], [1, 1, 101, 101, 0.9, 0])
+    candidate = boxes([0, 0, 100, 100, 0.9, 0])
+    matched, _, _ = match_boxes(reference, candidate)
+    assert matched == 1
+
+
+def test_match_boxes_empty():
+    assert match_boxes(boxes(), boxes([0, 0, 10, 10, 0.5, 0])) == (0, 0.0, 0.0)
+
+
+def test_parity_report_recall_and_iou():
+    frames = [("a", "a"), ("b", "b")]
+    reference = FakeEngine({"a": [boxes([0, 0, 100, 100, 0.9, 0])], "b": [boxes([0, 0, 50, 50, 0.9, 0], [60, 60, 90, 90, 0.7, 67])]})
+    candidate = FakeEngine({"a": [boxes([0, 0, 100, 100, 0.9, 0])], "b": [boxes([0, 0, 50, 50, 0.8, 0])]})
+    report = parity_report(reference, candidate, frames)
+    assert report["objects"] == {"reference": 3, "candidate": 2, "matched": 2, "max_conf_delta": 0.1, "mean_iou": 1.0, "recall": 0.6667}
+    assert not parity_passed(report)
+    assert parity_passed(parity_report(reference, reference, frames))
+
+
+def test_onnx_matches_pytorch():
+    # Real models on recorded frames, needs onnxruntime, a populated model cache and frames to compare on
+    pytest.importorskip("onnxruntime")
+    pytest.importorskip("cv2")
+    registry = ModelRegistry(Settings.MODEL_CACHE_DIR, Settings.MODEL_VERSION)
+    if not all(registry.is_cached(name) for name in ("yolov5s", "drowsiness")) or not os.path.exists(os.path.join(registry.repo_dir, "hubconf.py")):
+        pytest.skip(f"model cache in {registry.root} is not populated")
+    if not frame_paths(Settings.CALIBRATION_DIR, 1):
+        pytest.skip(f"no recorded frames in {Settings.CALIBRATION_DIR}")
+
+    reference, candidate = parity_engines(registry, "onnx")
+    assert all(detector.backend.name == "onnx" for detector in candidate.detectors)
+    report = parity_report(reference, candidate, load_frames(Settings.CALIBRATION_DIR, 50))
+    assert parity_passed(report), report
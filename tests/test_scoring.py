@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+from modules.scoring import DISTRACTIONS, Presence, ScoringEngine, ScoringRules, score_timeline
+
+
+def random_stream(seed, n=3000):
+    # Flags in runs of random length so episodes and alerts actually happen, gaps sometimes longer than max_gap
+    rng = np.random.default_rng(seed)
+    times = np.cumsum(rng.choice([0.05, 0.1, 0.2, 0.5, 3.0], size=n, p=[0.3, 0.3, 0.2, 0.15, 0.05])) + rng.uniform(0, 100)
+    flags = []
+    for _ in range(3):
+        runs = rng.integers(1, 120, size=n)
+        values = np.repeat(rng.random(len(runs)) < 0.5, runs)[:n]
+        flags.append(values)
+    return times, *flags
+
+
+def run_engine(rules, times, person, phone, drowsy, enabled):
+    engine = ScoringEngine(rules)
+    engine.started = True
+    productivity, events = [], []
+    for t, p, ph, d in zip(times.tolist(), person, phone, drowsy):
+        update = engine.observe(t, Presence(bool(p), bool(ph), bool(d)), enabled)
+        productivity.append(update.productivity)
+        events += update.events
+    return engine, productivity, events
+
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("min_productivity", [None, 0.0])
+@pytest.mark.parametrize("enabled", [(True, True, True), (True, False, True)])
+def test_score_timeline_matches_streaming_engine(seed, min_productivity, enabled):
+    rules = ScoringRules(penalty={"away": 10.0, "phone": 15.0, "drowsy": 5.0}, recovery=5.0, min_productivity=min_productivity)
+    times, person, phone, drowsy = random_stream(seed)
+
+    engine, productivity, events = run_engine(rules, times, person, phone, drowsy, enabled)
+    scored = score_timeline(times, person, phone, drowsy, rules, enabled)
+
+    np.testing.assert_allclose(scored["productivity"], productivity, atol=1e-6)
+    for k in DISTRACTIONS:
+        assert scored["totals"][k] == pytest.approx(engine.totals[k], abs=1e-6)
+        assert scored["episodes"][k] == engine.episodes[k]
+        assert scored["alerts"][k] == engine.alerts[k]
+    assert scored["critical_error"] == engine.critical_error()
+
+    key = lambda event: (event.timestamp, event.kind, event.reason)
+    assert len(scored["events"]) == len(events)
+    for batch, live in zip(sorted(scored["events"], key=key), sorted(events, key=key)):
+        assert key(batch) == key(live)
+        assert batch.value == pytest.approx(live.value, abs=1e-6)
+
+
+def test_score_timeline_empty():
+    scored = score_timeline([], [], [], [], ScoringRules())
+    assert len(scored["productivity"]) == 0
+    assert scored["events"] == []
+    assert scored["critical_error"] is None
@@ -1 +1,3 @@
 from . custom_grips import CustomGrip
+from . productivity_graph import ProductivityGraph
+from . video_widget import VideoWidget, GLVideoWidget, Overlay, OverlayItem
@@ -0,0 +1 @@
+from . productivity_graph import ProductivityGraph
@@ -0,0 +1,107 @@
+import time
+
+from PySide6.QtCore import *
+from PySide6.QtGui import *
+from PySide6.QtWidgets import *
+
+class ProductivityGraph(QWidget):
+    # PERSISTENT PRODUCTIVITY CHART
+    # One Figure and one line for the whole session, new points are blitted at a capped rate
+    def __init__(self, parent=None, max_points=600, max_fps=5):
+        QWidget.__init__(self, parent)
+
+        # MATPLOTLIB IS ONLY IMPORTED WHEN THE FIRST GRAPH IS CREATED
+        from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg as FigureCanvas
+        from matplotlib.figure import Figure
+        import seaborn as sns
+        sns.set_theme()
+        sns.set_context("paper")
+
+        self.max_points = max_points # History is halved (every other point kept) when it grows past this
+        self.min_interval = 1.0 / max_fps
+        self.times = []
+        self.values = []
+        self._last_draw = 0.0
+        self._pending = False
+        self._background = None
+
+        # FIGURE
+        self.figure = Figure(figsize = (5.31, 2.11))
+        self.ax = self.figure.add_subplot()
+        self.ax.set_xlabel('Time')
+        self.ax.set_ylabel('Productivity Level')
+        self.ax.tick_params(colors='white', which='both')
+        self.ax.xaxis.label.set_color('white')
+        self.ax.yaxis.label.set_color('white')
+        self.ax.set_facecolor('none')
+        self.figure.set_facecolor('none')
+        self.line, = self.ax.plot([], [], color='red', animated=True)
+        self._reset_limits()
+
+        # CANVAS
+        self.canvas = FigureCanvas(self.figure)
+        self.canvas.mpl_connect('draw_event', self._on_draw)
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addWidget(self.canvas)
+
+    def _reset_limits(self):
+        self.ax.set_xlim(0, 60)
+        self.ax.set_ylim(0, 110)
+
+    def _on_draw(self, event):
+        # Full redraws (resize, rescale) refresh the cached background, then the line goes on top
+        self._background = self.canvas.copy_from_bbox(self.ax.bbox)
+        self.ax.draw_artist(self.line)
+
+    def _limits_changed(self, t, value):
+        # Axis limits grow geometrically so full redraws stay rare in long sessions
+        changed = False
+        x0, x1 = self.ax.get_xlim()
+        if t > x1:
+            self.ax.set_xlim(x0, max(t, x1 * 2))
+            changed = True
+        y0, y1 = self.ax.get_ylim()
+        if value < y0 or value > y1:
+            span = y1 - y0
+            self.ax.set_ylim(min(y0, value - span * 0.1), max(y1, value + span * 0.1))
+            changed = True
+        return changed
+
+    def append(self, t, value):
+        self.times.append(t)
+        self.values.append(value)
+        if len(self.times) > self.max_points:
+            self.times = self.times[::2]
+            self.values = self.values[::2]
+        if self._limits_changed(t, value):
+            self._background = None
+        self._pending = True
+        self.refresh()
+
+    def refresh(self, force=False):
+        if not self._pending:
+            return
+        now = time.monotonic()
+        if not force and now - self._last_draw < self.min_interval:
+            return
+        self._last_draw = now
+        self._pending = False
+
+        self.line.set_data(self.times, self.values)
+        if self._background is None:
+            self.canvas.draw() # Redraws axes and caches the new background through _on_draw
+            self.canvas.blit(self.ax.bbox)
+            return
+        self.canvas.restore_region(self._background)
+        self.ax.draw_artist(self.line)
+        self.canvas.blit(self.ax.bbox)
+
+    def clear(self):
+        self.times = []
+        self.values = []
+        self.line.set_data([], [])
+        self._reset_limits()
+        self._background = None
+        self._pending = True
+        self.refresh(force=True)
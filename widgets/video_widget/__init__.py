@@ -0,0 +1,8 @@
+from . overlay import Overlay, OverlayItem
+from . video_widget import VideoWidget
+
+# OPENGL SURFACE - None when this Qt build has no OpenGL widget module
+try:
+    from . gl_video_widget import GLVideoWidget
+except ImportError:
+    GLVideoWidget = None
@@ -0,0 +1,207 @@
+from PySide6.QtCore import *
+from PySide6.QtGui import *
+from PySide6.QtWidgets import *
+from PySide6.QtOpenGL import QOpenGLBuffer, QOpenGLPixelTransferOptions, QOpenGLShader, QOpenGLShaderProgram, QOpenGLTexture
+from PySide6.QtOpenGLWidgets import QOpenGLWidget
+from shiboken6 import VoidPtr
+
+from . overlay import Overlay
+
+# GL ENUMS - QOpenGLFunctions takes them as plain ints
+GL_COLOR_BUFFER_BIT = 0x4000
+GL_FLOAT = 0x1406
+GL_LINES = 0x0001
+GL_TRIANGLE_STRIP = 0x0005
+
+# GLSL 1.10 so the same shaders run on desktop drivers and Mesa's llvmpipe/softpipe
+VERTEX_SHADER = """
+attribute vec2 position;
+attribute vec3 color;
+uniform vec2 frameSize;
+uniform vec2 scale;
+varying vec2 uv;
+varying vec3 tint;
+void main() {
+    uv = position / frameSize;
+    tint = color;
+    vec2 ndc = (uv * 2.0 - 1.0) * vec2(1.0, -1.0);
+    gl_Position = vec4(ndc * scale, 0.0, 1.0);
+}
+"""
+
+FRAGMENT_SHADER = """
+uniform sampler2D frame;
+uniform float textured;
+varying vec2 uv;
+varying vec3 tint;
+void main() {
+    gl_FragColor = mix(vec4(tint, 1.0), texture2D(frame, uv), textured);
+}
+"""
+
+FLOATS_PER_VERTEX = 5 # x, y in frame pixels, r, g, b
+
+
+class GLVideoWidget(QOpenGLWidget):
+    # WEBCAM SURFACE RENDERED WITH OPENGL
+    # Frames are uploaded as a texture, detection boxes are line geometry and the aspect-fit scaling happens in
+    # the vertex shader, so drawing cost doesn't depend on the window size or the number of boxes.
+    # Same frame_buffer()/present()/overlay interface as VideoWidget.
+    # `failed` fires once when no usable GL context or shader program exists, the owner swaps in a VideoWidget.
+    failed = Signal(str)
+
+    def __init__(self, parent=None):
+        QOpenGLWidget.__init__(self, parent)
+        self.overlay = Overlay()
+        self.error = None
+        self._buffer = None
+        self._dirty = False
+        self._texture = None
+        self._program = None
+        self._quad = None
+        self._lines = None
+        self._line_vertices = 0
+        self._overlay_version = -1 # Overlay version the line buffer was built from
+        self.frames_presented = 0
+        self.frames_uploaded = 0
+
+    def frame_buffer(self, shape):
+        # Persistent (h, w, 3) uint8 BGR buffer, the texture is reallocated only when the size changes
+        if self._buffer is None or self._buffer.shape != shape:
+            import numpy as np
+            self._buffer = np.zeros(shape, dtype=np.uint8)
+        return self._buffer
+
+    def set_frame(self, image):
+        self.frame_buffer(image.shape)[...] = image
+        self.present()
+
+    def present(self):
+        self._dirty = True
+        self.frames_presented += 1
+        self.update()
+
+    def clear(self):
+        self._buffer = None
+        self.overlay.clear()
+        self.update()
+
+    def _fail(self, error):
+        if self.error is None:
+            self.error = error
+            print(f"OpenGL video surface unavailable: {error}")
+            self.failed.emit(error)
+
+    def showEvent(self, event):
+        QOpenGLWidget.showEvent(self, event)
+        # A context that couldn't be created never reaches initializeGL, check once the show has been processed
+        QTimer.singleShot(0, lambda: self.isValid() or self._fail("no OpenGL context"))
+
+    def initializeGL(self):
+        self._program = QOpenGLShaderProgram(self)
+        compiled = self._program.addShaderFromSourceCode(QOpenGLShader.Vertex, VERTEX_SHADER)
+        compiled = self._program.addShaderFromSourceCode(QOpenGLShader.Fragment, FRAGMENT_SHADER) and compiled
+        self._program.bindAttributeLocation("position", 0)
+        self._program.bindAttributeLocation("color", 1)
+        if not compiled or not self._program.link():
+            self._fail(f"video shader failed to build: {self._program.log()}")
+            return
+
+        self._quad = QOpenGLBuffer(QOpenGLBuffer.VertexBuffer)
+        self._quad.create()
+        self._lines = QOpenGLBuffer(QOpenGLBuffer.VertexBuffer)
+        self._lines.setUsagePattern(QOpenGLBuffer.DynamicDraw)
+        self._lines.create()
+
+        self._transfer = QOpenGLPixelTransferOptions()
+        self._transfer.setAlignment(1) # Rows of odd-width frames aren't 4-byte aligned
+
+        functions = self.context().functions()
+        functions.glClearColor(0x22 / 255, 0x22 / 255, 0x22 / 255, 1.0)
+
+    def _upload_frame(self):
+        h, w = self._buffer.shape[:2]
+        if self._texture is None or (self._texture.width(), self._texture.height()) != (w, h):
+            import numpy as np
+            if self._texture is not None:
+                self._texture.destroy()
+            self._texture = QOpenGLTexture(QOpenGLTexture.Target2D)
+            self._texture.setSize(w, h)
+            self._texture.setFormat(QOpenGLTexture.RGB8_UNorm)
+            self._texture.setMinMagFilters(QOpenGLTexture.Linear, QOpenGLTexture.Linear)
+            self._texture.setWrapMode(QOpenGLTexture.ClampToEdge)
+            self._texture.allocateStorage(QOpenGLTexture.BGR, QOpenGLTexture.UInt8)
+
+            # Frame-sized quad, texture coordinates come from the position in the shader
+            quad = np.array([0, 0, 0, 0, 0, w, 0, 0, 0, 0, 0, h, 0, 0, 0, w, h, 0, 0, 0], dtype=np.float32)
+            self._quad.bind()
+            self._quad.allocate(VoidPtr(quad), quad.nbytes)
+            self._quad.release()
+        self._texture.setData(QOpenGLTexture.BGR, QOpenGLTexture.UInt8, VoidPtr(self._buffer), self._transfer)
+        self.frames_uploaded += 1
+
+    def _upload_boxes(self):
+        # Visible overlay boxes as 4 line segments each, x, y, r, g, b per vertex
+        import numpy as np
+        items = self.overlay.visible_items()
+        if items:
+            x1, y1, x2, y2 = np.array([item.box for item in items], dtype=np.float32).T
+            corners = np.stack([x1, y1, x2, y1, x2, y1, x2, y2, x2, y2, x1, y2, x1, y2, x1, y1], 1).reshape(-1, 2)
+            rgb = np.array([self.overlay.COLORS[item.kind].getRgbF()[:3] for item in items], dtype=np.float32)
+            vertices = np.ascontiguousarray(np.hstack([corners, np.repeat(rgb, 8, 0)]), dtype=np.float32)
+            self._lines.bind()
+            self._lines.allocate(VoidPtr(vertices), vertices.nbytes)
+            self._lines.release()
+        self._line_vertices = len(items) * 8
+        self._overlay_version = self.overlay.version
+
+    def _fit(self):
+        # Fraction of the widget the frame covers on each axis, keeping its aspect ratio
+        h, w = self._buffer.shape[:2]
+        size = QSizeF(w, h).scaled(QSizeF(self.width(), self.height()), Qt.KeepAspectRatio)
+        return size.width() / max(1, self.width()), size.height() / max(1, self.height())
+
+    def _draw(self, vbo, mode, count, textured):
+        stride = FLOATS_PER_VERTEX * 4
+        vbo.bind()
+        self._program.setUniformValue1f("textured", textured)
+        self._program.enableAttributeArray(0)
+        self._program.enableAttributeArray(1)
+        self._program.setAttributeBuffer(0, GL_FLOAT, 0, 2, stride)
+        self._program.setAttributeBuffer(1, GL_FLOAT, 2 * 4, 3, stride)
+        self.context().functions().glDrawArrays(mode, 0, count)
+        self._program.disableAttributeArray(0)
+        self._program.disableAttributeArray(1)
+        vbo.release()
+
+    def paintGL(self):
+        functions = self.context().functions()
+        functions.glClear(GL_COLOR_BUFFER_BIT)
+        if self._buffer is None or self.error is not None:
+            return
+        if self._dirty:
+            self._upload_frame()
+            self._dirty = False
+        if self._overlay_version != self.overlay.version:
+            self._upload_boxes()
+
+        h, w = self._buffer.shape[:2]
+        scale_x, scale_y = self._fit()
+        self._program.bind()
+        self._program.setUniformValue("frameSize", QVector2D(w, h))
+        self._program.setUniformValue("scale", QVector2D(scale_x, scale_y))
+        self._program.setUniformValue1i("frame", 0)
+        self._texture.bind(0)
+        self._draw(self._quad, GL_TRIANGLE_STRIP, 4, 1.0)
+        self._texture.release()
+        if self._line_vertices:
+            functions.glLineWidth(2.0)
+            self._draw(self._lines, GL_LINES, self._line_vertices, 0.0)
+        self._program.release()
+
+        # Labels are the only thing left to QPainter, cached glyph runs on top of the GL frame
+        if self.overlay.items or self.overlay.status:
+            painter = QPainter(self)
+            origin = QPointF((1 - scale_x) * self.width() / 2, (1 - scale_y) * self.height() / 2)
+            self.overlay.paint(painter, origin, scale_x * self.width() / w, boxes=False)
+            painter.end()
@@ -0,0 +1,77 @@
+from collections import namedtuple
+
+from PySide6.QtCore import *
+from PySide6.QtGui import *
+
+# ONE DETECTION TO DRAW - kind is person, phone or drowsy, box is x1, y1, x2, y2 in frame pixels
+OverlayItem = namedtuple("OverlayItem", ["kind", "box", "name", "conf"])
+
+
+class Overlay():
+    # DETECTION RECORDS COMPOSITED ON TOP OF THE FRAME AT PAINT TIME
+    # The frame buffer is never drawn on; hiding a kind only changes what the next paint draws
+    COLORS = {"person": QColor(0, 255, 0), "phone": QColor(0, 0, 255), "drowsy": QColor(255, 0, 0)}
+    STATUS_COLOR = QColor(255, 255, 0)
+    MAX_GLYPHS = 512
+
+    def __init__(self):
+        self.items = []
+        self.visible = {kind: True for kind in self.COLORS}
+        self.status = None # Optional debug line in the top left corner
+        self.version = 0 # Bumped on every change, lets surfaces rebuild cached geometry lazily
+        self._glyphs = {} # Label text -> QStaticText, laid out once and reused across frames
+        self._font = QFont()
+        self._font.setPixelSize(13)
+        self._font.setBold(True)
+
+    def set_items(self, items):
+        self.items = items
+        self.version += 1
+
+    def set_visible(self, kind, visible):
+        if self.visible.get(kind) != visible:
+            self.visible[kind] = visible
+            self.version += 1
+
+    def visible_items(self):
+        return [item for item in self.items if self.visible.get(item.kind)]
+
+    def glyph(self, text):
+        glyph = self._glyphs.get(text)
+        if glyph is None:
+            if len(self._glyphs) >= self.MAX_GLYPHS:
+                self._glyphs.clear()
+            glyph = QStaticText(text)
+            glyph.setPerformanceHint(QStaticText.AggressiveCaching)
+            glyph.prepare(QTransform(), self._font)
+            self._glyphs[text] = glyph
+        return glyph
+
+    def paint(self, painter, origin, gain, boxes=True):
+        # Draws in frame coordinates: origin is where the frame's top left corner lands, gain its scale
+        painter.save()
+        painter.translate(origin)
+        painter.scale(gain, gain)
+        painter.setFont(self._font)
+        items = self.visible_items()
+        if boxes:
+            painter.setBrush(Qt.NoBrush)
+            for item in items:
+                x1, y1, x2, y2 = item.box
+                painter.setPen(QPen(self.COLORS[item.kind], 2))
+                painter.drawRect(QRectF(x1, y1, x2 - x1, y2 - y1))
+
+        # Labels sit on top of their box, only visible items get a label string
+        painter.setPen(QColor(255, 255, 255))
+        for item in items:
+            glyph = self.glyph(f"{item.name} {item.conf:.2f}")
+            painter.drawStaticText(QPointF(item.box[0], item.box[1] - glyph.size().height()), glyph)
+        if self.status:
+            painter.setPen(self.STATUS_COLOR)
+            painter.drawStaticText(QPointF(8, 6), self.glyph(self.status))
+        painter.restore()
+
+    def clear(self):
+        self.items = []
+        self.status = None
+        self.version += 1
@@ -0,0 +1,72 @@
+from PySide6.QtCore import *
+from PySide6.QtGui import *
+from PySide6.QtWidgets import *
+
+from . overlay import Overlay
+
+class VideoWidget(QWidget):
+    # WEBCAM SURFACE THAT SCALES ON PAINT
+    # Frames are written into one preallocated BGR buffer that a QImage wraps without copying,
+    # so showing a frame allocates nothing and no colour conversion or pre-scaled copy is made.
+    # Detections are composited from the overlay while painting, the buffer stays a clean camera frame.
+    def __init__(self, parent=None):
+        QWidget.__init__(self, parent)
+        self.overlay = Overlay()
+        self._buffer = None
+        self._image = None
+        self._target = QRect()
+        self.frames_presented = 0
+        self.setAttribute(Qt.WA_OpaquePaintEvent)
+
+    def frame_buffer(self, shape):
+        # Persistent (h, w, 3) uint8 buffer to copy the next frame into, reallocated only when the size changes
+        if self._buffer is None or self._buffer.shape != shape:
+            import numpy as np
+            self._buffer = np.zeros(shape, dtype=np.uint8)
+            h, w = shape[:2]
+            self._image = QImage(self._buffer.data, w, h, self._buffer.strides[0], QImage.Format_BGR888)
+            self._update_target()
+        return self._buffer
+
+    def set_frame(self, image):
+        self.frame_buffer(image.shape)[...] = image
+        self.present()
+
+    def present(self):
+        # The buffer has a new frame, repaint on the next paint cycle
+        self.frames_presented += 1
+        self.update()
+
+    def clear(self):
+        self._buffer = None
+        self._image = None
+        self.overlay.clear()
+        self.update()
+
+    def _update_target(self):
+        # Largest rect with the frame's aspect ratio, centred in the widget
+        if self._image is None:
+            return
+        size = self._image.size().scaled(self.size(), Qt.KeepAspectRatio)
+        self._target = QRect(QPoint((self.width() - size.width()) // 2, (self.height() - size.height()) // 2), size)
+
+    def resizeEvent(self, event):
+        self._update_target()
+        QWidget.resizeEvent(self, event)
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), QColor("#222"))
+        if self._image is None:
+            font = painter.font()
+            font.setBold(True)
+            painter.setFont(font)
+            painter.setPen(QColor("#76acdb"))
+            painter.drawText(self.rect(), Qt.AlignCenter, "Webcam")
+        else:
+            painter.setRenderHint(QPainter.SmoothPixmapTransform)
+            painter.drawImage(self._target, self._image)
+            self.overlay.paint(painter, QPointF(self._target.topLeft()), self._target.width() / self._image.width())
+        painter.setPen(QColor("#515A63")) # Same border as the label it replaces
+        painter.drawRect(self.rect().adjusted(0, 0, -1, -1))
+        painter.end()